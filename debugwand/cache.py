@@ -0,0 +1,33 @@
+"""In-process caches for debugwand."""
+
+import time
+from collections import OrderedDict
+
+
+class TTLCache[K, V]:
+    """A bounded mapping whose entries expire `ttl` seconds after being set.
+    Once `maxsize` is reached the oldest entry is evicted."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -1,10 +1,10 @@
 import os
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import typer
-from rich.console import Console
 
 from debugwand import container as container_ops
 from debugwand import kubernetes as k8s
@@ -26,7 +26,9 @@ from debugwand.ui import (
 )
 
 app = typer.Typer()
-console = Console()
+
+# Upper bound on concurrent `kubectl exec` calls when listing processes across pods
+_MAX_PARALLEL_POD_EXECS = 16
 
 
 @app.command(help="List pods in the specified namespace.")
@@ -47,12 +49,16 @@ def pods(
     if with_pids:
         pod_list = k8s.get_pods_for_service_handler(namespace, service)
 
+        # List processes in all pods concurrently, each one is a kubectl exec
+        # round-trip, so total latency is bounded by the slowest pod, not the sum
+        workers = min(len(pod_list), _MAX_PARALLEL_POD_EXECS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(k8s.list_python_processes_handler, pod_list))
+
         # Collect all pod-process pairs
-        pod_processes: list[tuple[PodInfo, list[ProcessInfo]]] = []
-        for pod in pod_list:
-            processes: list[ProcessInfo] | None = k8s.list_python_processes_handler(pod)
-            if processes:
-                pod_processes.append((pod, processes))
+        pod_processes: list[tuple[PodInfo, list[ProcessInfo]]] = [
+            (pod, processes) for pod, processes in zip(pod_list, results) if processes
+        ]
 
         # Render all pods and processes in a single grouped table
         if pod_processes:
@@ -84,15 +90,19 @@ def inject(
             "❌ No running Python processes found in the selected pod.", err=True
         )
         raise typer.Exit(code=1)
-    pid = k8s.get_and_select_process(pod, None)
+    pid = k8s.get_and_select_process(pod, None, processes)
 
-    # Copy the user's script into the pod
+    # Copy the user's script and the attacher script (used to inject and run the
+    # user's script) into the pod
     script_basename = os.path.basename(script)
-    k8s.copy_to_pod(pod, script, f"/tmp/{script_basename}")
-
-    # Copy the attacher script into the pod (used to inject and run the user's script)
     attacher_path = Path(__file__).parent / "attacher.py"
-    k8s.copy_to_pod(pod, str(attacher_path), "/tmp/attacher.py")
+    k8s.copy_files_to_pod_handler(
+        pod,
+        [
+            (script, f"/tmp/{script_basename}"),
+            (str(attacher_path), "/tmp/attacher.py"),
+        ],
+    )
 
     k8s.exec_command(
         pod=pod,
@@ -111,12 +121,15 @@ def _inject_debugpy_into_pod(pod: PodInfo, pid: int, script_path: str) -> None:
     """Inject a debugpy script into a specific process in a pod."""
     script_basename = os.path.basename(script_path)
 
-    # Copy the attacher script into the pod
+    # Copy the attacher script and the debugpy script into the pod
     attacher_path = Path(__file__).parent / "attacher.py"
-    k8s.copy_to_pod(pod, str(attacher_path), "/tmp/attacher.py")
-
-    # Copy debugpy script into the pod
-    k8s.copy_to_pod(pod, script_path, f"/tmp/{script_basename}")
+    k8s.copy_files_to_pod_handler(
+        pod,
+        [
+            (str(attacher_path), "/tmp/attacher.py"),
+            (script_path, f"/tmp/{script_basename}"),
+        ],
+    )
 
     print_step(
         f"Injecting debugpy into PID [cyan bold]{pid}[/cyan bold] in pod [blue]{pod.name}[/blue]..."
@@ -301,8 +314,8 @@ def _monitor_and_handle_reload_mode(
                 try:
                     reinject_script_path = prepare_debugpy_script(port=port, wait=False)
                     reinject_basename = os.path.basename(reinject_script_path)
-                    k8s.copy_to_pod(
-                        pod, reinject_script_path, f"/tmp/{reinject_basename}"
+                    k8s.copy_files_to_pod(
+                        pod, [(reinject_script_path, f"/tmp/{reinject_basename}")]
                     )
 
                     # Run injection in background (non-blocking)
@@ -332,6 +345,10 @@ def _monitor_and_handle_reload_mode(
                     print_info(
                         "Worker is running - reconnect your debugger to continue debugging"
                     )
+                except subprocess.CalledProcessError as e:
+                    stderr = e.stderr.decode(errors="replace").strip()
+                    print_info(f" Failed to re-inject debugpy: {stderr}", prefix="❌")
+                    return pid, False
                 except Exception as e:
                     print_info(f" Failed to re-inject debugpy: {e}", prefix="❌")
                     return pid, False
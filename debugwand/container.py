@@ -8,7 +8,14 @@ from pathlib import Path
 
 import typer
 
-from debugwand.operations import detect_reload_mode, prepare_debugpy_script, select_pid
+from debugwand.operations import (
+    PS_COMMAND,
+    detect_reload_mode,
+    iter_command_lines,
+    parse_ps_line,
+    prepare_debugpy_script,
+    select_pid,
+)
 from debugwand.types import ProcessInfo
 from debugwand.ui import print_connection_info, print_info, print_step, print_success
 
@@ -56,23 +63,12 @@ def monitor_worker_pid(runtime: str, container: str, initial_pid: int) -> int |
 
 def list_python_processes(runtime: str, container: str) -> list[ProcessInfo]:
     """List Python processes in a container."""
-    cmd = [runtime, "exec", container, "ps", "aux"]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    processes: list[ProcessInfo] = []
-    for line in result.stdout.splitlines():
-        if "python" in line.lower():
-            parts = line.split(None, 10)
-            if len(parts) >= 11:
-                processes.append(
-                    ProcessInfo(
-                        pid=int(parts[1]),
-                        user=parts[0],
-                        cpu_percent=float(parts[2]),
-                        mem_percent=float(parts[3]),
-                        command=parts[10],
-                    )
-                )
-    return processes
+    cmd = [runtime, "exec", container, *PS_COMMAND]
+    return [
+        process
+        for process in map(parse_ps_line, iter_command_lines(cmd))
+        if process is not None
+    ]
 
 
 def exec_command(
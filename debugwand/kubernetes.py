@@ -1,17 +1,53 @@
 """Kubernetes operations for debugwand."""
 
+import io
 import json
 import os
 import subprocess
+import tarfile
 import time
+from operator import attrgetter
 from typing import Any
 
 import typer
 
+from debugwand.cache import TTLCache
+from debugwand.operations import (
+    PS_COMMAND,
+    detect_reload_mode,
+    iter_command_lines,
+    parse_ps_line,
+    prompt_for_selection,
+    select_pid,
+)
 from debugwand.types import PodInfo, ProcessInfo
 
 _KNATIVE_SERVICE_LABEL = "serving.knative.dev/service"
 
+# Service selectors rarely change mid-session, so reconnect/poll loops can reuse
+# them for a short while instead of re-running `kubectl get service` every time.
+# Keyed by (namespace, service); set DEBUGWAND_NO_CACHE=1 to always refetch.
+_service_selector_cache = TTLCache[tuple[str, str], str](maxsize=256, ttl=30.0)
+
+# Ask kubectl for just the fields PodInfo needs, one tab-separated line per pod,
+# instead of full Pod objects. Label keys/values can't contain "," or "=", so
+# labels are emitted as "key=value," pairs.
+_POD_FIELDS_TEMPLATE = (
+    "{{range .items}}"
+    '{{.metadata.name}}{{"\\t"}}'
+    '{{.metadata.namespace}}{{"\\t"}}'
+    '{{with .spec.nodeName}}{{.}}{{end}}{{"\\t"}}'
+    '{{with .status.phase}}{{.}}{{end}}{{"\\t"}}'
+    '{{with .metadata.creationTimestamp}}{{.}}{{end}}{{"\\t"}}'
+    "{{range $key, $value := .metadata.labels}}{{$key}}={{$value}},{{end}}"
+    '{{"\\n"}}'
+    "{{end}}"
+)
+
+# Polling backoff bounds (seconds) used while waiting for a replacement pod
+_WAIT_INITIAL_INTERVAL = 1
+_WAIT_MAX_INTERVAL = 15
+
 
 # ===== Pod selection =====
 
@@ -41,10 +77,9 @@ def select_pod(pods: list[PodInfo]) -> PodInfo:
             f"{idx + 1}: {pod.name} (Namespace: {pod.namespace}, Status: {pod.status})"
         )
 
-    selection = int(typer.prompt("Enter the number of the pod to select")) - 1
-    if selection < 0 or selection >= len(running_pods):
-        raise ValueError("Invalid selection.")
-
+    selection = prompt_for_selection(
+        "Enter the number of the pod to select", len(running_pods)
+    )
     return running_pods[selection]
 
 
@@ -60,16 +95,37 @@ def _get_label_selector_for_service(service_json: dict[str, Any], service: str)
     if not selector:
         raise ValueError(f"Service {service} has no selector.")
 
-    return ",".join(f"{key}={value}" for key, value in selector.items())
+    # Sorted so the same selector always yields the same string, however the
+    # service spec happens to order its keys
+    return ",".join(map("=".join, sorted(selector.items())))
+
+
+def _get_service_label_selectors(namespace: str, services: list[str]) -> dict[str, str]:
+    """Look up the pod label selector for each service, cached for a short TTL.
+    Services missing from the cache are fetched with a single kubectl call."""
+    use_cache = os.environ.get("DEBUGWAND_NO_CACHE") != "1"
+    selectors: dict[str, str] = {}
+    missing: list[str] = []
+    for service in dict.fromkeys(services):
+        cached = _service_selector_cache.get((namespace, service))
+        if use_cache and cached is not None:
+            selectors[service] = cached
+        else:
+            missing.append(service)
 
+    if not missing:
+        return selectors
 
-def get_pods_for_service(namespace: str, service: str) -> list[PodInfo]:
-    cmd = ["kubectl", "get", "service", service, "-n", namespace, "-o", "json"]
+    cmd = ["kubectl", "get", "service", *missing, "-n", namespace, "-o", "json"]
 
     result = subprocess.run(cmd, capture_output=True, text=True, check=False)
 
     if result.returncode != 0:
         if "NotFound" in result.stderr or "not found" in result.stderr:
+            service = next(
+                (name for name in missing if f'"{name}"' in result.stderr),
+                ", ".join(missing),
+            )
             raise ValueError(
                 f"Service '{service}' not found in namespace '{namespace}'.\n"
                 f"Tip: Check the service exists with: kubectl get svc -n {namespace}\n"
@@ -81,9 +137,68 @@ def get_pods_for_service(namespace: str, service: str) -> list[PodInfo]:
                 result.returncode, cmd, result.stdout, result.stderr
             )
 
+    # kubectl returns the object itself for one name and a List for several
     service_json = json.loads(result.stdout)
-    label_selector = _get_label_selector_for_service(service_json, service)
-    return get_pods_by_label(namespace=namespace, label_selector=label_selector)
+    if len(missing) > 1:
+        by_name = {item["metadata"]["name"]: item for item in service_json["items"]}
+    else:
+        by_name = {missing[0]: service_json}
+    for service, item in by_name.items():
+        label_selector = _get_label_selector_for_service(item, service)
+        _service_selector_cache[(namespace, service)] = label_selector
+        selectors[service] = label_selector
+    return selectors
+
+
+def _merge_label_selectors(selectors: list[str]) -> str | None:
+    """Merge equality selectors into one set-based selector, e.g.
+    "app=a,tier=web" and "app=b,tier=web" become "app in (a,b),tier=web".
+    Returns None when the union can't be expressed as a single selector,
+    i.e. the selectors use different label keys or differ in more than one."""
+    parsed = [dict(term.split("=", 1) for term in s.split(",")) for s in selectors]
+    keys = parsed[0].keys()
+    if any(labels.keys() != keys for labels in parsed):
+        return None
+
+    terms: list[str] = []
+    varying = 0
+    for key in keys:
+        values = list(dict.fromkeys(labels[key] for labels in parsed))
+        if len(values) == 1:
+            terms.append(f"{key}={values[0]}")
+        else:
+            varying += 1
+            terms.append(f"{key} in ({','.join(values)})")
+
+    return ",".join(terms) if varying <= 1 else None
+
+
+def get_pods_for_services(namespace: str, services: list[str]) -> list[PodInfo]:
+    """List the pods backing any of the given services in one namespace."""
+    if not services:
+        return []
+
+    selectors = list(
+        dict.fromkeys(_get_service_label_selectors(namespace, services).values())
+    )
+
+    merged = _merge_label_selectors(selectors)
+    if merged is not None:
+        return get_pods_by_label(namespace=namespace, label_selector=merged)
+
+    # Selectors can't be combined, so query per service and drop pods shared
+    # between services
+    pods: dict[str, PodInfo] = {}
+    for label_selector in selectors:
+        for pod in get_pods_by_label(
+            namespace=namespace, label_selector=label_selector
+        ):
+            pods.setdefault(pod.name, pod)
+    return list(pods.values())
+
+
+def get_pods_for_service(namespace: str, service: str) -> list[PodInfo]:
+    return get_pods_for_services(namespace, [service])
 
 
 def get_pods_for_service_handler(namespace: str, service: str) -> list[PodInfo]:
@@ -99,29 +214,33 @@ def get_pods_for_service_handler(namespace: str, service: str) -> list[PodInfo]:
     return pod_list
 
 
+def _parse_pod_line(line: str) -> PodInfo:
+    name, namespace, node_name, status, creation_time, labels = line.split("\t")
+    return PodInfo(
+        name=name,
+        namespace=namespace,
+        node_name=node_name,
+        status=status,
+        labels={
+            key: value
+            for key, _, value in (pair.partition("=") for pair in labels.split(","))
+            if key
+        },
+        creation_time=creation_time,
+    )
+
+
 def get_pods_by_label(
     namespace: str | None, label_selector: str | None
 ) -> list[PodInfo]:
-    cmd = ["kubectl", "get", "pods", "-o", "json"]
+    cmd = ["kubectl", "get", "pods", "-o", f"go-template={_POD_FIELDS_TEMPLATE}"]
     if namespace:
         cmd.extend(["-n", namespace])
     if label_selector:
         cmd.extend(["-l", label_selector])
 
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    pods_json = json.loads(result.stdout)
-
-    return [
-        PodInfo(
-            name=item["metadata"]["name"],
-            namespace=item["metadata"]["namespace"],
-            node_name=item["spec"].get("nodeName", ""),
-            status=item["status"]["phase"],
-            labels=item["metadata"].get("labels", {}),
-            creation_time=item["metadata"].get("creationTimestamp", ""),
-        )
-        for item in pods_json.get("items", [])
-    ]
+    # Build PodInfo objects as kubectl streams lines rather than after it exits
+    return [_parse_pod_line(line) for line in iter_command_lines(cmd) if line]
 
 
 def get_and_select_pod(service: str, namespace: str) -> PodInfo:
@@ -149,22 +268,13 @@ def list_python_processes(pod: PodInfo) -> list[ProcessInfo]:
     if pod.status != "Running":
         raise ValueError(f"Pod '{pod.name}' is not running (status: {pod.status})")
 
-    cmd = ["kubectl", "exec", pod.name, "-n", pod.namespace, "--", "ps", "aux"]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    processes: list[ProcessInfo] = []
-    for line in result.stdout.splitlines():
-        if "python" in line.lower():
-            parts = line.split(None, 10)
-            processes.append(
-                ProcessInfo(
-                    pid=int(parts[1]),
-                    user=parts[0],
-                    cpu_percent=float(parts[2]),
-                    mem_percent=float(parts[3]),
-                    command=parts[10],
-                )
-            )
-    return processes
+    cmd = ["kubectl", "exec", pod.name, "-n", pod.namespace, "--", *PS_COMMAND]
+    # Filter lines as kubectl streams them rather than buffering the whole output
+    return [
+        process
+        for process in map(parse_ps_line, iter_command_lines(cmd))
+        if process is not None
+    ]
 
 
 def list_python_processes_handler(pod: PodInfo) -> list[ProcessInfo] | None:
@@ -188,12 +298,14 @@ def list_python_processes_handler(pod: PodInfo) -> list[ProcessInfo] | None:
         return None
 
 
-def get_and_select_process(pod: PodInfo, pid: int | None) -> int:
+def get_and_select_process(
+    pod: PodInfo, pid: int | None, processes: list[ProcessInfo] | None = None
+) -> int:
     """Get and select a Python process in the given pod. If pid is provided, validate it exists.
-    Otherwise, prompt the user to select one."""
-    from debugwand.operations import select_pid
-
-    processes = list_python_processes(pod)
+    Otherwise, prompt the user to select one.
+    Pass processes if they were already listed to skip another kubectl exec."""
+    if processes is None:
+        processes = list_python_processes(pod)
     if not processes:
         raise ValueError("No Python processes found in the selected pod.")
 
@@ -211,7 +323,6 @@ def get_and_select_process(pod: PodInfo, pid: int | None) -> int:
 
 def get_and_select_process_handler(pod: PodInfo, pid: int | None) -> int:
     try:
-        from debugwand.operations import detect_reload_mode
         from debugwand.ui import print_reload_mode_warning
 
         # Get processes to check for reload mode
@@ -219,8 +330,8 @@ def get_and_select_process_handler(pod: PodInfo, pid: int | None) -> int:
         if not processes:
             raise ValueError("No Python processes found in the selected pod.")
 
-        # Now do the actual selection
-        selected_pid = get_and_select_process(pod, pid)
+        # Now do the actual selection, reusing the listing from above
+        selected_pid = get_and_select_process(pod, pid, processes)
 
         # Check for reload mode and show warning after selection
         is_reload, worker_proc = detect_reload_mode(processes)
@@ -270,9 +381,35 @@ def exec_command(
     return result.stdout
 
 
-def copy_to_pod(pod: PodInfo, local_path: str, remote_path: str):
-    cmd = ["kubectl", "cp", local_path, f"{pod.namespace}/{pod.name}:{remote_path}"]
-    subprocess.run(cmd, check=True)
+def _reset_tar_owner(tarinfo: tarfile.TarInfo) -> tarfile.TarInfo:
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ""
+    return tarinfo
+
+
+def copy_files_to_pod(pod: PodInfo, files: list[tuple[str, str]]):
+    """Copy several (local_path, remote_path) files into a pod with one kubectl call.
+    Pipes a tar archive into `tar -x` in the pod, which is what `kubectl cp` does
+    internally, but pays kubectl's startup and API round-trip once for all files."""
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        for local_path, remote_path in files:
+            tar.add(
+                local_path, arcname=remote_path.lstrip("/"), filter=_reset_tar_owner
+            )
+
+    cmd = ["kubectl", "exec", "-i", pod.name, "-n", pod.namespace, "--"]
+    cmd += ["tar", "-xmf", "-", "-C", "/"]
+    subprocess.run(cmd, input=archive.getvalue(), capture_output=True, check=True)
+
+
+def copy_files_to_pod_handler(pod: PodInfo, files: list[tuple[str, str]]):
+    try:
+        copy_files_to_pod(pod, files)
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode(errors="replace").strip()
+        typer.echo(f"❌ Failed to copy files into pod '{pod.name}': {stderr}", err=True)
+        raise typer.Exit(code=1)
 
 
 # ===== Auto-reconnect helpers =====
@@ -296,26 +433,32 @@ def find_replacement_pod(
 
     # Try to match by revision/generation (Knative)
     if "serving.knative.dev/revision" in old_pod.labels:
-        same_service_pods = [
-            p
-            for p in candidate_pods
-            if p.labels.get("serving.knative.dev/service")
-            == old_pod.labels.get("serving.knative.dev/service")
-        ]
-        if same_service_pods:
-            # Return the newest (by name, which includes generation)
-            return sorted(same_service_pods, key=lambda p: p.name, reverse=True)[0]
+        old_service = old_pod.labels.get("serving.knative.dev/service")
+        # Return the newest (by name, which includes generation)
+        newest_same_service = max(
+            (
+                p
+                for p in candidate_pods
+                if p.labels.get("serving.knative.dev/service") == old_service
+            ),
+            key=attrgetter("name"),
+            default=None,
+        )
+        if newest_same_service:
+            return newest_same_service
 
     # Fall back to newest pod by name
-    return sorted(candidate_pods, key=lambda p: p.name, reverse=True)[0]
+    return max(candidate_pods, key=attrgetter("name"))
 
 
 def wait_for_new_pod(service: str, namespace: str, timeout: int = 300) -> PodInfo:
-    """Wait for a new pod to become ready after the old one has terminated."""
-    start_time = time.time()
-    wait_interval = 5
+    """Wait for a new pod to become ready after the old one has terminated.
+    Polls with exponential backoff (1s, 2s, 4s, ... capped at 15s) so a fresh
+    pod is picked up quickly without hammering the API server on slow rollouts."""
+    deadline = time.monotonic() + timeout
+    wait_interval = _WAIT_INITIAL_INTERVAL
 
-    while time.time() - start_time < timeout:
+    while True:
         try:
             pods = get_pods_for_service(namespace=namespace, service=service)
             running_pods = [p for p in pods if p.status == "Running"]
@@ -329,7 +472,12 @@ def wait_for_new_pod(service: str, namespace: str, timeout: int = 300) -> PodInf
                         continue
         except Exception:
             pass
-        time.sleep(wait_interval)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(wait_interval, remaining))
+        wait_interval = min(wait_interval * 2, _WAIT_MAX_INTERVAL)
 
     raise TimeoutError(f"Timed out waiting for a new pod in service '{service}'")
 
@@ -339,8 +487,6 @@ def monitor_worker_pid(pod: PodInfo, initial_pid: int) -> int | None:
     Returns None if monitoring should stop (e.g., pod gone or error).
     Returns initial_pid if no change detected yet.
     """
-    from debugwand.operations import detect_reload_mode
-
     try:
         processes = list_python_processes(pod)
         if not processes:
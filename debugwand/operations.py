@@ -1,66 +1,73 @@
 """Shared operations and utilities for debugwand."""
 
+import re
 import socket
 import subprocess
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
+from typing import IO, cast
+
+import typer
 
 from debugwand.types import ProcessInfo
 
+# The template never changes at runtime, so read it once at import time
+_DEBUGPY_TEMPLATE = (Path(__file__).parent / "debugpy_template.py").read_text()
+
 # ===== Port availability =====
 
 
 def is_port_available(port: int) -> bool:
+    """Check that nothing is accepting connections on localhost:port.
+
+    Probes with a TCP connect instead of a bind, so a port left in TIME_WAIT by a
+    previous port-forward is reported as available rather than busy.
+    """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        try:
-            sock.bind(("127.0.0.1", port))
-            return True
-        except OSError:
-            return False
+        sock.settimeout(0.05)
+        return sock.connect_ex(("127.0.0.1", port)) != 0
+
+
+def _parse_lsof_fields(output: str) -> tuple[int, str] | None:
+    """Parse `lsof -F pc` output into the first (pid, command name) pair."""
+    pid = None
+    for line in output.splitlines():
+        if line.startswith("p") and pid is None:
+            pid = int(line[1:])
+        elif line.startswith("c") and pid is not None:
+            return pid, line[1:]
+    return (pid, "") if pid is not None else None
 
 
 def find_process_using_port(port: int) -> tuple[int, str] | None:
     """Find the process using a specific port. Returns (pid, command) or None."""
     try:
-        # Try lsof with LISTEN state first (works on macOS and Linux)
-        result = subprocess.run(
-            ["lsof", "-iTCP:" + str(port), "-sTCP:LISTEN", "-n", "-P"],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-
-        # If no listener found, try without LISTEN filter (for ESTABLISHED connections)
-        if result.returncode != 0 or not result.stdout.strip():
+        # Try listeners first, then any connection (e.g. ESTABLISHED). `-F pc` emits
+        # machine-readable "p<pid>"/"c<command>" lines, so there's no header to skip.
+        for selector in (["-iTCP:" + str(port), "-sTCP:LISTEN"], ["-i", f":{port}"]):
             result = subprocess.run(
-                ["lsof", "-i", f":{port}", "-n", "-P"],
+                ["lsof", "-n", "-P", "-F", "pc", *selector],
                 capture_output=True,
                 text=True,
                 check=False,
             )
-
-        if result.returncode == 0 and result.stdout.strip():
-            lines = result.stdout.strip().split("\n")
-            # Skip header line, take first actual result
-            if len(lines) > 1:
-                # Format: COMMAND PID USER FD TYPE DEVICE SIZE/OFF NODE NAME
-                parts = lines[1].split()
-                if len(parts) >= 2:
-                    try:
-                        pid = int(parts[1])
-                        command = parts[0]
-                        # Get full command for this PID
-                        ps_result = subprocess.run(
-                            ["ps", "-p", str(pid), "-o", "command="],
-                            capture_output=True,
-                            text=True,
-                            check=False,
-                        )
-                        if ps_result.returncode == 0 and ps_result.stdout.strip():
-                            return pid, ps_result.stdout.strip()
-                        return pid, command
-                    except ValueError, IndexError:
-                        pass
+            if result.returncode != 0:
+                continue
+
+            match = _parse_lsof_fields(result.stdout)
+            if match:
+                pid, command = match
+                # lsof only reports the executable name, get the full command line
+                ps_result = subprocess.run(
+                    ["ps", "-p", str(pid), "-o", "command="],
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+                if ps_result.returncode == 0 and ps_result.stdout.strip():
+                    return pid, ps_result.stdout.strip()
+                return pid, command
     except FileNotFoundError, ValueError:
         pass
 
@@ -105,6 +112,52 @@ def kill_process(pid: int) -> bool:
             return False
 
 
+# ===== Process listing =====
+
+
+def iter_command_lines(cmd: list[str]) -> Iterator[str]:
+    """Run a command and yield its stdout line by line as it arrives, so callers
+    can parse while it is still running instead of buffering the whole output.
+    Raises CalledProcessError (with stderr) if the command exits non-zero."""
+    # stderr goes to a file rather than a pipe: nothing reads a pipe until stdout
+    # hits EOF, so a child filling the stderr pipe buffer would block both sides
+    with tempfile.TemporaryFile("w+") as stderr_file:
+        with subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True, bufsize=1
+        ) as proc:
+            stdout = cast(IO[str], proc.stdout)  # never None with stdout=PIPE
+            for line in stdout:
+                yield line.rstrip("\n")
+
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, stderr=stderr_file.read()
+            )
+
+
+# Only the columns ProcessInfo needs and no header line, instead of `ps aux`.
+# `args` goes last since it is the only column that can contain spaces.
+PS_COMMAND = ["ps", "-eo", "user=,pid=,pcpu=,pmem=,args="]
+
+
+def parse_ps_line(line: str) -> ProcessInfo | None:
+    """Parse a line of PS_COMMAND output, or None if it isn't a Python process."""
+    if "python" not in line.lower():
+        return None
+    parts = line.split(None, 4)
+    if len(parts) < 5:
+        return None
+    user, pid, cpu_percent, mem_percent, command = parts
+    return ProcessInfo(
+        pid=int(pid),
+        user=user,
+        cpu_percent=float(cpu_percent),
+        mem_percent=float(mem_percent),
+        command=command,
+    )
+
+
 # ===== Process detection patterns =====
 
 _HELPER_PROCESS_PATTERNS = [
@@ -124,14 +177,25 @@ _MAIN_PROCESS_INDICATORS = [
 ]
 
 
+# One precompiled alternation per pattern list: a single scan of the command
+# instead of one substring search per pattern
+_HELPER_PROCESS_RE = re.compile("|".join(map(re.escape, _HELPER_PROCESS_PATTERNS)))
+_MAIN_PROCESS_RE = re.compile("|".join(map(re.escape, _MAIN_PROCESS_INDICATORS)))
+
+
 def _is_helper_process(proc: ProcessInfo) -> bool:
     """Check if process is a known helper/internal process."""
-    return any(pattern in proc.command for pattern in _HELPER_PROCESS_PATTERNS)
+    return _HELPER_PROCESS_RE.search(proc.command) is not None
 
 
 def _has_main_process_indicator(proc: ProcessInfo) -> bool:
     """Check if process has main process indicators."""
-    return any(indicator in proc.command for indicator in _MAIN_PROCESS_INDICATORS)
+    return _MAIN_PROCESS_RE.search(proc.command) is not None
+
+
+def _is_spawned_worker(proc: ProcessInfo) -> bool:
+    """Check if process is a multiprocessing worker (e.g. a uvicorn --reload worker)."""
+    return "multiprocessing.spawn" in proc.command and "spawn_main" in proc.command
 
 
 def is_main_process(proc: ProcessInfo) -> bool:
@@ -155,22 +219,32 @@ def detect_reload_mode(
 
     Returns (is_reload_mode, worker_process).
     """
-    # Look for parent process with --reload flag
+    # Look for the parent process with --reload flag and the spawned worker process
+    # in a single pass, stopping as soon as both are found
     reload_parent = None
+    worker_proc = None
     for proc in processes:
-        if "--reload" in proc.command and proc.pid == 1:
+        if proc.pid == 1 and "--reload" in proc.command:
             reload_parent = proc
+        elif worker_proc is None and _is_spawned_worker(proc):
+            worker_proc = proc
+        if reload_parent and worker_proc:
             break
 
     if not reload_parent:
         return False, None
 
-    # Find the spawned worker process
-    for proc in processes:
-        if "multiprocessing.spawn" in proc.command and "spawn_main" in proc.command:
-            return True, proc
+    return True, worker_proc
 
-    return True, None
+
+def prompt_for_selection(text: str, count: int) -> int:
+    """Prompt for a 1-based choice out of count options and return its 0-based index.
+    Re-prompts on invalid input so callers never have to redo the listing."""
+    while True:
+        selection = typer.prompt(text, type=int)
+        if 1 <= selection <= count:
+            return selection - 1
+        typer.echo(f"Please enter a number between 1 and {count}.", err=True)
 
 
 def select_pid(processes: list[ProcessInfo]) -> int:
@@ -203,14 +277,14 @@ def select_pid(processes: list[ProcessInfo]) -> int:
         marker = ""
         if proc.pid == 1:
             marker = " [MAIN]"
-        elif "multiprocessing.spawn" in proc.command and "spawn_main" in proc.command:
+        elif _is_spawned_worker(proc):
             marker = " [WORKER]"
         print(
             f"{idx + 1}: PID {proc.pid}{marker}, User: {proc.user}, CPU%: {proc.cpu_percent}, MEM%: {proc.mem_percent}, CMD: {cmd_short}"
         )
-    selection = int(input("Enter the number of the PID to select: ")) - 1
-    if selection < 0 or selection >= len(main_processes):
-        raise ValueError("Invalid selection.")
+    selection = prompt_for_selection(
+        "Enter the number of the PID to select", len(main_processes)
+    )
     return main_processes[selection].pid
 
 
@@ -219,11 +293,8 @@ def select_pid(processes: list[ProcessInfo]) -> int:
 
 def prepare_debugpy_script(port: int, wait: bool = True) -> str:
     """Prepare the debugpy injection script with the given port and wait settings."""
-    template_path = Path(__file__).parent / "debugpy_template.py"
-    with open(template_path, "r") as f:
-        script_content = f.read()
-
-    script_content = script_content.replace("{PORT}", str(port)).replace(
+    # str.format() can't be used here: the template's f-strings contain braces
+    script_content = _DEBUGPY_TEMPLATE.replace("{PORT}", str(port)).replace(
         "{WAIT}", str(wait)
     )
 
@@ -3,7 +3,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PodInfo:
     name: str
     namespace: str
@@ -13,7 +13,7 @@ class PodInfo:
     creation_time: str  # ISO 8601 timestamp from metadata.creationTimestamp
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ProcessInfo:
     pid: int
     user: str
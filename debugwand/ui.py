@@ -1,27 +1,62 @@
+import functools
 import os
+import re
+import sys
+from collections.abc import Iterable
 
 from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
+from rich.text import Text
 
 from debugwand.operations import detect_reload_mode, is_main_process
 from debugwand.types import PodInfo, ProcessInfo
 
-# Global console for UI functions
-_console = Console()
 
-# Check if we should use simple UI (e.g., when running in Tilt)
-_use_simple_ui = os.getenv("DEBUGWAND_SIMPLE_UI") == "1"
+@functools.cache
+def _get_console() -> Console:
+    """Global console for UI functions, created on first use rather than at import
+    time since most error paths never print through it."""
+    return Console()
 
 
-def render_pods_table(pods: list[PodInfo]):
-    table = Table()
+@functools.cache
+def _use_simple_ui() -> bool:
+    """Check if we should use simple UI (e.g., when running in Tilt)."""
+    return os.getenv("DEBUGWAND_SIMPLE_UI") == "1"
+
+
+def _use_plain_output() -> bool:
+    """Print tables as tab-separated text in simple UI mode or when stdout isn't a
+    terminal (piped or captured), where Rich's table layout is wasted work."""
+    return _use_simple_ui() or not _get_console().is_terminal
+
+
+def _print_plain_rows(header: tuple[str, ...], rows: Iterable[tuple[str, ...]]):
+    """Write a header and rows as tab-separated lines in a single write."""
+    sys.stdout.write("".join("\t".join(row) + "\n" for row in [header, *rows]))
+
+
+# Secondary process labels, keyed by the command fragment that identifies them.
+# A command carries at most one of these, so a single precompiled search replaces
+# one substring scan per label.
+_PROC_TYPE_LABELS = {
+    "multiprocessing.resource_tracker": "helper",
+    "multiprocessing.spawn": "worker",
+    "debugpy/adapter": "debugger",
+}
+_PROC_TYPE_RE = re.compile("|".join(map(re.escape, _PROC_TYPE_LABELS)))
+
+_ELLIPSIS = "..."
+
+
+def _truncate(text: str, width: int) -> str:
+    """Shorten text to at most width characters, ending in an ellipsis if cut."""
+    if len(text) <= width:
+        return text
+    return text[: width - len(_ELLIPSIS)] + _ELLIPSIS
 
-    table.add_column("Pod Name", style="cyan", no_wrap=True)
-    table.add_column("Namespace", style="magenta")
-    table.add_column("Status", style="green")
-    table.add_column("Created", style="yellow", no_wrap=True)
 
+def render_pods_table(pods: list[PodInfo]):
+    rows: list[tuple[str, str, str, str]] = []
     for pod in pods:
         # Format timestamp to be more readable (e.g., "2025-11-13 19:29")
         # Remove seconds and timezone for compactness
@@ -31,143 +66,164 @@ def render_pods_table(pods: list[PodInfo]):
             created_display = created_display.split(".")[0]
         # Remove seconds for more compact display
         created_display = ":".join(created_display.split(":")[:2])
-        table.add_row(pod.name, pod.namespace, pod.status, created_display)
+        rows.append((pod.name, pod.namespace, pod.status, created_display))
 
-    _console.print(table)
+    header = ("Pod Name", "Namespace", "Status", "Created")
+    if _use_plain_output():
+        _print_plain_rows(header, rows)
+        return
 
+    from rich.table import Table
 
-def render_processes_table(pod_processes: list[tuple[PodInfo, list[ProcessInfo]]]):
     table = Table()
 
-    table.add_column("Pod", style="blue", no_wrap=True, max_width=28)
-    table.add_column("PID", style="cyan", no_wrap=True, justify="right", width=4)
-    table.add_column("Type", style="dim", width=10)
-    table.add_column("Command", style="white", no_wrap=False)
+    table.add_column(header[0], style="cyan", no_wrap=True)
+    table.add_column(header[1], style="magenta")
+    table.add_column(header[2], style="green")
+    table.add_column(header[3], style="yellow", no_wrap=True)
+
+    for row in rows:
+        # Plain data, so build Text cells directly instead of parsing each as markup
+        table.add_row(*map(Text, row))
+
+    _get_console().print(table)
+
 
+def _resolve_recommended(processes: list[ProcessInfo]) -> tuple[int | None, bool]:
+    """Return (recommended_pid, is_reload) for one pod's processes: the reload
+    worker if there is one, otherwise the first main process."""
+    is_reload, worker_proc = detect_reload_mode(processes)
+    if worker_proc:
+        return worker_proc.pid, is_reload
+
+    # If no reload mode, recommend the main process
+    main_proc = next((proc for proc in processes if is_main_process(proc)), None)
+    return (main_proc.pid if main_proc else None), is_reload
+
+
+def render_processes_table(pod_processes: list[tuple[PodInfo, list[ProcessInfo]]]):
+    rows: list[tuple[str, str, str, str]] = []
     for pod, processes in pod_processes:
-        # Detect reload mode to identify recommended PID
-        is_reload, worker_proc = detect_reload_mode(processes)
-        recommended_pid = worker_proc.pid if worker_proc else None
-
-        # If no reload mode, recommend the main process
-        if not recommended_pid:
-            for proc in processes:
-                if is_main_process(proc):
-                    recommended_pid = proc.pid
-                    break
-
-        for idx, proc in enumerate(processes):
-            # Show shortened pod name only in the first row for this pod
-            if idx == 0:
-                # Shorten pod name for display (keep first ~25 chars + ...)
-                pod_display = pod.name if len(pod.name) <= 28 else pod.name[:25] + "..."
-            else:
-                pod_display = ""
+        recommended_pid, is_reload = _resolve_recommended(processes)
 
+        for proc in processes:
             # Determine process type label
             proc_type = ""
             if proc.pid == recommended_pid:
                 proc_type = "⭐ MAIN"
             elif is_reload and proc.pid == 1:
                 proc_type = "PARENT"
-            elif "multiprocessing.resource_tracker" in proc.command:
-                proc_type = "helper"
-            elif (
-                "multiprocessing.spawn" in proc.command and proc.pid != recommended_pid
-            ):
-                proc_type = "worker"
-            elif "debugpy/adapter" in proc.command:
-                proc_type = "debugger"
-
-            # Shorten command for readability
-            cmd_display = proc.command
-            if len(cmd_display) > 80:
-                cmd_display = cmd_display[:77] + "..."
-
-            table.add_row(
-                pod_display,
-                str(proc.pid),
-                proc_type,
-                cmd_display,
-            )
+            elif match := _PROC_TYPE_RE.search(proc.command):
+                proc_type = _PROC_TYPE_LABELS[match.group()]
 
-    _console.print(table)
+            rows.append((pod.name, str(proc.pid), proc_type, proc.command))
+
+    header = ("Pod", "PID", "Type", "Command")
+    if _use_plain_output():
+        _print_plain_rows(header, rows)
+        return
+
+    from rich.table import Table
+
+    table = Table()
+
+    table.add_column(header[0], style="blue", no_wrap=True, max_width=28)
+    table.add_column(header[1], style="cyan", no_wrap=True, justify="right", width=4)
+    table.add_column(header[2], style="dim", width=10)
+    table.add_column(header[3], style="white", no_wrap=False)
+
+    previous_pod = None
+    for pod_name, pid, proc_type, command in rows:
+        # Show the pod name only in the first row for each pod, and shorten pod
+        # names (keep first ~25 chars + ...) and commands for readability
+        pod_display = "" if pod_name == previous_pod else _truncate(pod_name, 28)
+        previous_pod = pod_name
+        row = (pod_display, pid, proc_type, _truncate(command, 80))
+        # Text cells skip Rich's markup parsing, so brackets in commands stay literal
+        table.add_row(*map(Text, row))
+
+    _get_console().print(table)
 
 
 def print_reload_mode_warning(worker_pid: int):
     """Print a formatted warning about reload mode detection."""
-    _console.print()
+    console = _get_console()
+    console.print()
+
+    # Styled spans instead of markup, so the message is never re-parsed and both
+    # layouts share it
+    message = Text.assemble(
+        "The app is running with ",
+        ("--reload", "cyan"),
+        ", which spawns worker processes.\n",
+        "Injecting into the ",
+        ("WORKER", "green bold"),
+        " process (PID ",
+        (str(worker_pid), "cyan"),
+        ").\n",
+        "Process monitoring enabled - debugpy will auto-reinject on worker restarts.",
+    )
 
-    if _use_simple_ui:
+    if _use_simple_ui():
         # Simple output for environments like Tilt
-        _console.print(
+        console.print(
             "[yellow]=============================== Reload Mode ===============================[/yellow]"
         )
-        _console.print(
-            "The app is running with [cyan]--reload[/cyan], which spawns worker processes."
-        )
-        _console.print(
-            f"Injecting into the [green bold]WORKER[/green bold] process (PID [cyan]{worker_pid}[/cyan])."
-        )
-        _console.print(
-            "Process monitoring enabled - debugpy will auto-reinject on worker restarts."
-        )
-        _console.print("[yellow]" + "=" * 75 + "[/yellow]")
+        console.print(message)
+        console.print("[yellow]" + "=" * 75 + "[/yellow]")
     else:
+        from rich.panel import Panel
+
         # Fancy panel for normal terminals
-        _console.print(
+        console.print(
             Panel(
-                f"The app is running with [cyan]--reload[/cyan], which spawns worker processes.\n"
-                f"Injecting into the [green bold]WORKER[/green bold] process (PID [cyan]{worker_pid}[/cyan]).\n"
-                f"Process monitoring enabled - debugpy will auto-reinject on worker restarts.",
+                message,
                 border_style="yellow",
                 title="Reload Mode",
                 expand=False,
             )
         )
 
-    _console.print(
+    console.print(
         f"[green]✅[/green] Auto-selecting worker process: [cyan bold]PID {worker_pid}[/cyan bold]"
     )
 
 
 def print_success(message: str, prefix: str = "✅"):
     """Print a success message."""
-    _console.print(f"[green]{prefix}[/green] {message}")
+    _get_console().print(f"[green]{prefix}[/green] {message}")
 
 
 def print_info(message: str, prefix: str = "ℹ️"):
     """Print an info message."""
-    _console.print(f"[blue]{prefix}[/blue]  {message}")
+    _get_console().print(f"[blue]{prefix}[/blue]  {message}")
 
 
 def print_step(message: str, prefix: str = "🔧"):
     """Print a step/progress message."""
-    _console.print(f"[cyan]{prefix}[/cyan] {message}")
+    _get_console().print(f"[cyan]{prefix}[/cyan] {message}")
 
 
 def print_connection_info(port: int):
     """Print formatted connection instructions with VSCode config."""
-    _console.print()
+    console = _get_console()
+    console.print()
 
-    if _use_simple_ui:
+    message = Text.assemble(
+        ("🎉 Ready to Debug!", "green bold"),
+        "\n\nConnect your debugger to: ",
+        (f"localhost:{port}", "cyan bold"),
+    )
+
+    if _use_simple_ui():
         # Simple output for environments like Tilt
-        _console.print("[green]" + "=" * 42 + "[/green]")
-        _console.print("[green bold]🎉 Ready to Debug![/green bold]")
-        _console.print()
-        _console.print(
-            f"Connect your debugger to: [cyan bold]localhost:{port}[/cyan bold]"
-        )
-        _console.print("[green]" + "=" * 42 + "[/green]")
+        console.print("[green]" + "=" * 42 + "[/green]")
+        console.print(message)
+        console.print("[green]" + "=" * 42 + "[/green]")
     else:
+        from rich.panel import Panel
+
         # Fancy panel for normal terminals
-        _console.print(
-            Panel(
-                f"[green bold]🎉 Ready to Debug![/green bold]\n\n"
-                f"Connect your debugger to: [cyan bold]localhost:{port}[/cyan bold]",
-                border_style="green",
-                expand=False,
-            )
-        )
+        console.print(Panel(message, border_style="green", expand=False))
 
-    _console.print("\n[dim]Press Ctrl+C to stop port-forwarding and exit.[/dim]\n")
+    console.print("\n[dim]Press Ctrl+C to stop port-forwarding and exit.[/dim]\n")
@@ -0,0 +1,72 @@
+import gc
+import os
+from collections.abc import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+from typer.testing import CliRunner
+
+from debugwand.types import PodInfo, ProcessInfo
+
+# Patches pass new_callable=Mock so no test pays for autospec=True, which
+# introspects the target's signature on every patch. Don't add autospec;
+# prefer monkeypatch.setattr when a test doesn't assert on calls.
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    """Under xdist, move everything built during collection out of the GC's reach.
+
+    Workers are spawned rather than forked, so there's no copy-on-write to save;
+    the win is that later collections skip the long-lived collected items.
+    """
+    if os.environ.get("PYTEST_XDIST_WORKER_COUNT"):
+        gc.collect()
+        gc.freeze()
+
+
+@pytest.fixture(scope="session")
+def cli_runner() -> CliRunner:
+    """A single CliRunner for the session; invoke() keeps no state between calls."""
+    return CliRunner()
+
+
+@pytest.fixture
+def mock_get_pods() -> Iterator[Mock]:
+    """Patch the service -> pods lookup shared by the CLI commands."""
+    with patch(
+        "debugwand.kubernetes.get_pods_for_service_handler", new_callable=Mock
+    ) as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_container_procs() -> Iterator[Mock]:
+    """Patch the Python process listing used by the container commands."""
+    with patch("debugwand.container.list_python_processes", new_callable=Mock) as mock:
+        yield mock
+
+
+@pytest.fixture(scope="session")
+def sample_pod() -> PodInfo:
+    """A running pod; frozen, so one instance is safely shared across tests.
+    Use dataclasses.replace() for variants."""
+    return PodInfo(
+        name="pod-1",
+        namespace="default",
+        node_name="node-1",
+        status="Running",
+        labels={"app": "test"},
+        creation_time="2025-01-01T00:00:00Z",
+    )
+
+
+@pytest.fixture(scope="session")
+def sample_process() -> ProcessInfo:
+    """A main Python process, shared like sample_pod."""
+    return ProcessInfo(
+        pid=1234,
+        user="root",
+        cpu_percent=0.5,
+        mem_percent=1.2,
+        command="python app.py",
+    )
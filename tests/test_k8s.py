@@ -1,23 +1,55 @@
 """Tests for k8s module - focusing on logic and parsing."""
 
+import io
 import json
-from unittest.mock import MagicMock, patch
+import subprocess
+import tarfile
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 import typer
 
 from debugwand.kubernetes import (
-    copy_to_pod,
+    _service_selector_cache,
+    copy_files_to_pod,
+    copy_files_to_pod_handler,
     exec_command,
+    find_replacement_pod,
     get_pods_by_label,
     get_pods_for_service,
+    get_pods_for_services,
     list_python_processes,
     select_pod,
+    wait_for_new_pod,
 )
 from debugwand.operations import select_pid
 from debugwand.types import PodInfo, ProcessInfo
 
 
+def _popen_output(stdout: str, returncode: int = 0) -> MagicMock:
+    """Build a subprocess.Popen result that streams the given stdout."""
+    popen = MagicMock()
+    proc = popen.__enter__.return_value
+    proc.stdout = io.StringIO(stdout)
+    proc.returncode = returncode
+    return popen
+
+
+def _set_popen_output(
+    mock_popen: Mock, stdout: str, returncode: int = 0, stderr: str = ""
+):
+    """Make a patched subprocess.Popen stream the given stdout and write stderr
+    to the file the caller redirects it to."""
+    popen = _popen_output(stdout, returncode)
+
+    def start(cmd: list[str], **kwargs) -> MagicMock:
+        kwargs["stderr"].write(stderr)
+        return popen
+
+    mock_popen.side_effect = start
+
+
 class TestSelectPod:
     """Tests for select_pod function."""
 
@@ -42,7 +74,20 @@ class TestSelectPod:
 
         assert result == pod
 
-    # Note: Can't easily test interactive selection without mocking input()
+    @patch("typer.prompt", new_callable=Mock)
+    def test_out_of_range_selection_reprompts(self, mock_prompt: Mock):
+        """Test that an out-of-range choice re-prompts instead of raising."""
+        pods = [
+            PodInfo("pod-1", "default", "node-1", "Running", {}, ""),
+            PodInfo("pod-2", "default", "node-1", "Pending", {}, ""),
+            PodInfo("pod-3", "default", "node-1", "Running", {}, ""),
+        ]
+        mock_prompt.side_effect = [3, 0, 2]
+
+        result = select_pod(pods)
+
+        assert result.name == "pod-3"
+        assert mock_prompt.call_count == 3
 
 
 class TestSelectPid:
@@ -61,100 +106,119 @@ class TestSelectPid:
 
         assert result == 1234
 
+    @patch("typer.prompt", new_callable=Mock)
+    def test_multiple_processes_prompts_for_selection(self, mock_prompt: Mock):
+        """Test that the chosen main process PID is returned."""
+        processes = [
+            ProcessInfo(10, "root", 0.5, 1.2, "gunicorn app:app"),
+            ProcessInfo(20, "root", 0.5, 1.2, "uvicorn app:app"),
+        ]
+        mock_prompt.side_effect = [7, 2]
 
-class TestGetPodsByLabel:
-    """Tests for get_pods_by_label function - focuses on JSON parsing."""
+        result = select_pid(processes)
 
-    @patch("subprocess.run")
-    def test_parses_pods_correctly(self, mock_run: MagicMock):
-        """Test that kubectl JSON output is parsed correctly into PodInfo objects."""
-        mock_output = {
-            "items": [
-                {
-                    "metadata": {
-                        "name": "app-pod-1",
-                        "namespace": "production",
-                        "labels": {"app": "myapp", "version": "v1"},
-                        "creationTimestamp": "2025-01-01T10:00:00Z",
-                    },
-                    "spec": {"nodeName": "node-1"},
-                    "status": {"phase": "Running"},
-                },
-                {
-                    "metadata": {
-                        "name": "app-pod-2",
-                        "namespace": "production",
-                        "labels": {"app": "myapp", "version": "v2"},
-                        "creationTimestamp": "2025-01-01T11:00:00Z",
-                    },
-                    "spec": {"nodeName": "node-2"},
-                    "status": {"phase": "Pending"},
-                },
-            ]
-        }
+        assert result == 20
+        assert mock_prompt.call_args.kwargs["type"] is int
 
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_run.return_value = mock_result
 
-        pods = get_pods_by_label(namespace="production", label_selector="app=myapp")
+class TestGetPodsByLabel:
+    """Tests for get_pods_by_label function - focuses on parsing the projected fields."""
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_parses_pods_correctly(self, mock_popen: Mock):
+        """Test that kubectl template output is parsed correctly into PodInfo objects."""
+        _set_popen_output(
+            mock_popen,
+            "app-pod-1\tproduction\tnode-1\tRunning\t2025-01-01T10:00:00Z\t"
+            "app=myapp,version=v1,\n"
+            "app-pod-2\tproduction\tnode-2\tPending\t2025-01-01T11:00:00Z\t"
+            "app=myapp,version=v2,\n",
+        )
 
-        assert len(pods) == 2
-        assert pods[0].name == "app-pod-1"
-        assert pods[0].namespace == "production"
-        assert pods[0].node_name == "node-1"
-        assert pods[0].status == "Running"
-        assert pods[0].labels == {"app": "myapp", "version": "v1"}
+        pods = get_pods_by_label(namespace="production", label_selector="app=myapp")
 
-        assert pods[1].name == "app-pod-2"
-        assert pods[1].status == "Pending"
+        assert pods == [
+            PodInfo(
+                name="app-pod-1",
+                namespace="production",
+                node_name="node-1",
+                status="Running",
+                labels={"app": "myapp", "version": "v1"},
+                creation_time="2025-01-01T10:00:00Z",
+            ),
+            PodInfo(
+                name="app-pod-2",
+                namespace="production",
+                node_name="node-2",
+                status="Pending",
+                labels={"app": "myapp", "version": "v2"},
+                creation_time="2025-01-01T11:00:00Z",
+            ),
+        ]
 
-    @patch("subprocess.run")
-    def test_handles_empty_items(self, mock_run: MagicMock):
-        """Test that empty items list returns empty pod list."""
-        mock_output: dict[str, list[dict[str, object]]] = {"items": []}
+        # Only the fields PodInfo needs are requested, not full Pod objects
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[:4] == ["kubectl", "get", "pods", "-o"]
+        assert call_args[4].startswith("go-template=")
+        assert call_args[5:] == ["-n", "production", "-l", "app=myapp"]
 
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_run.return_value = mock_result
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_handles_empty_items(self, mock_popen: Mock):
+        """Test that empty output returns empty pod list."""
+        _set_popen_output(mock_popen, "")
 
         pods = get_pods_by_label(namespace="default", label_selector="app=test")
 
         assert pods == []
 
-    @patch("subprocess.run")
-    def test_handles_missing_node_name(self, mock_run: MagicMock):
-        """Test that missing nodeName is handled gracefully."""
-        mock_output: dict[str, list[dict[str, object]]] = {
-            "items": [
-                {
-                    "metadata": {
-                        "name": "pending-pod",
-                        "namespace": "default",
-                        "labels": {},
-                        "creationTimestamp": "2025-01-01T00:00:00Z",
-                    },
-                    "spec": {},  # No nodeName - pod not scheduled yet
-                    "status": {"phase": "Pending"},
-                }
-            ]
-        }
-
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_output)
-        mock_run.return_value = mock_result
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_handles_missing_node_name(self, mock_popen: Mock):
+        """Test that missing nodeName and labels are handled gracefully."""
+        # No nodeName (pod not scheduled yet) and no labels
+        _set_popen_output(
+            mock_popen, "pending-pod\tdefault\t\tPending\t2025-01-01T00:00:00Z\t\n"
+        )
 
         pods = get_pods_by_label(namespace="default", label_selector=None)
 
         assert len(pods) == 1
         assert pods[0].node_name == ""  # Empty string for missing nodeName
+        assert pods[0].labels == {}
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_handles_labels_with_prefixes_and_empty_values(self, mock_popen: Mock):
+        """Test that prefixed label keys and empty label values survive parsing."""
+        _set_popen_output(
+            mock_popen,
+            "app-00001-abc\tdefault\tnode-1\tRunning\t2025-01-01T00:00:00Z\t"
+            "serving.knative.dev/service=app,tier=,\n",
+        )
+
+        pods = get_pods_by_label(namespace="default", label_selector=None)
+
+        assert pods[0].labels == {"serving.knative.dev/service": "app", "tier": ""}
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_failed_listing_raises_with_stderr(self, mock_popen: Mock):
+        """Test that a failing kubectl get surfaces its stderr."""
+        _set_popen_output(mock_popen, "", returncode=1, stderr="Unauthorized")
+
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            get_pods_by_label(namespace="default", label_selector=None)
+
+        assert exc_info.value.stderr == "Unauthorized"
 
 
 class TestGetPodsForService:
     """Tests for get_pods_for_service - service type handling."""
 
-    @patch("subprocess.run")
-    def test_standard_service_with_selector(self, mock_run: MagicMock):
+    @pytest.fixture(autouse=True)
+    def _clear_selector_cache(self):
+        _service_selector_cache.clear()
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_standard_service_with_selector(self, mock_run: Mock, mock_popen: Mock):
         """Test standard ClusterIP service with selector."""
         service_output = {
             "spec": {
@@ -163,87 +227,226 @@ class TestGetPodsForService:
             }
         }
 
-        pods_output: dict[str, list[dict[str, object]]] = {
-            "items": [
-                {
-                    "metadata": {
-                        "name": "pod-1",
-                        "namespace": "default",
-                        "labels": {},
-                        "creationTimestamp": "2025-01-01T00:00:00Z",
-                    },
-                    "spec": {"nodeName": "node-1"},
-                    "status": {"phase": "Running"},
-                }
-            ]
-        }
+        pods_output = "pod-1\tdefault\tnode-1\tRunning\t2025-01-01T00:00:00Z\t\n"
 
-        # First call: get service, second call: get pods
-        mock_run.side_effect = [
-            MagicMock(stdout=json.dumps(service_output), returncode=0, stderr=""),
-            MagicMock(stdout=json.dumps(pods_output), returncode=0, stderr=""),
-        ]
+        # Service lookup runs to completion, pod listing is streamed
+        mock_run.return_value = Mock(
+            stdout=json.dumps(service_output), returncode=0, stderr=""
+        )
+        _set_popen_output(mock_popen, pods_output)
 
         pods = get_pods_for_service(namespace="default", service="myapp-service")
 
         assert len(pods) == 1
         # Verify kubectl was called with correct label selector
-        second_call_args = mock_run.call_args_list[1][0][0]
-        assert "-l" in second_call_args
-        label_idx = second_call_args.index("-l") + 1
-        assert second_call_args[label_idx] == "app=myapp,tier=frontend"
+        pods_call_args = mock_popen.call_args[0][0]
+        assert "-l" in pods_call_args
+        label_idx = pods_call_args.index("-l") + 1
+        assert pods_call_args[label_idx] == "app=myapp,tier=frontend"
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_selector_labels_are_sorted(self, mock_run: Mock, mock_popen: Mock):
+        """Test that the label selector is built in sorted key order."""
+        service_output = {
+            "spec": {"selector": {"tier": "frontend", "app": "myapp", "env": "prod"}}
+        }
+        mock_run.return_value = Mock(
+            stdout=json.dumps(service_output), returncode=0, stderr=""
+        )
+        _set_popen_output(mock_popen, "")
+
+        get_pods_for_service(namespace="default", service="myapp-service")
+
+        pods_call_args = mock_popen.call_args[0][0]
+        label_idx = pods_call_args.index("-l") + 1
+        assert pods_call_args[label_idx] == "app=myapp,env=prod,tier=frontend"
 
-    @patch("subprocess.run")
-    def test_knative_external_name_service(self, mock_run: MagicMock):
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_knative_external_name_service(self, mock_run: Mock, mock_popen: Mock):
         """Test Knative ExternalName service uses different label selector."""
         service_output = {"spec": {"type": "ExternalName"}}
 
-        pods_output: dict[str, list[dict[str, object]]] = {"items": []}
-
-        mock_run.side_effect = [
-            MagicMock(stdout=json.dumps(service_output), returncode=0, stderr=""),
-            MagicMock(stdout=json.dumps(pods_output), returncode=0, stderr=""),
-        ]
+        mock_run.return_value = Mock(
+            stdout=json.dumps(service_output), returncode=0, stderr=""
+        )
+        _set_popen_output(mock_popen, "")
 
         get_pods_for_service(namespace="default", service="knative-service")
 
         # Verify kubectl was called with Knative label selector
-        second_call_args = mock_run.call_args_list[1][0][0]
-        assert "-l" in second_call_args
-        label_idx = second_call_args.index("-l") + 1
+        pods_call_args = mock_popen.call_args[0][0]
+        assert "-l" in pods_call_args
+        label_idx = pods_call_args.index("-l") + 1
         assert (
-            second_call_args[label_idx] == "serving.knative.dev/service=knative-service"
+            pods_call_args[label_idx] == "serving.knative.dev/service=knative-service"
+        )
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_service_selector_is_cached(self, mock_run: Mock, mock_popen: Mock):
+        """Test that repeated lookups reuse the service selector."""
+        service_output = {"spec": {"type": "ClusterIP", "selector": {"app": "myapp"}}}
+        mock_run.return_value = Mock(
+            stdout=json.dumps(service_output), returncode=0, stderr=""
+        )
+        mock_popen.side_effect = [_popen_output(""), _popen_output("")]
+
+        get_pods_for_service(namespace="default", service="myapp-service")
+        get_pods_for_service(namespace="default", service="myapp-service")
+
+        # One service lookup, then one pod listing per call
+        assert mock_run.call_count == 1
+        assert mock_popen.call_count == 2
+        assert mock_popen.call_args_list[0][0][0] == mock_popen.call_args_list[1][0][0]
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_service_selector_cache_disabled(
+        self,
+        mock_run: Mock,
+        mock_popen: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that DEBUGWAND_NO_CACHE=1 refetches the service every time."""
+        monkeypatch.setenv("DEBUGWAND_NO_CACHE", "1")
+        service_output = {"spec": {"type": "ClusterIP", "selector": {"app": "myapp"}}}
+
+        mock_run.return_value = Mock(
+            stdout=json.dumps(service_output), returncode=0, stderr=""
+        )
+        mock_popen.side_effect = [_popen_output(""), _popen_output("")]
+
+        get_pods_for_service(namespace="default", service="myapp-service")
+        get_pods_for_service(namespace="default", service="myapp-service")
+
+        assert mock_run.call_count == 2
+
+    @patch("debugwand.cache.time.monotonic", new_callable=Mock)
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_service_selector_cache_expires(
+        self, mock_run: Mock, mock_popen: Mock, mock_monotonic: Mock
+    ):
+        """Test that cached selectors are refetched once the TTL has passed."""
+        service_output = {"spec": {"type": "ClusterIP", "selector": {"app": "myapp"}}}
+
+        mock_run.return_value = Mock(
+            stdout=json.dumps(service_output), returncode=0, stderr=""
+        )
+        mock_popen.side_effect = [_popen_output(""), _popen_output("")]
+        # Stored at t=0 (expires at 30), checked and re-stored at t=31
+        mock_monotonic.side_effect = [0.0, 31.0, 31.0]
+
+        get_pods_for_service(namespace="default", service="myapp-service")
+        get_pods_for_service(namespace="default", service="myapp-service")
+
+        assert mock_run.call_count == 2
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_multiple_services_single_pod_query(self, mock_run: Mock, mock_popen: Mock):
+        """Test that services differing in one label share a single pod query."""
+        services_output = {
+            "kind": "List",
+            "items": [
+                {
+                    "metadata": {"name": "api"},
+                    "spec": {"selector": {"app": "api", "tier": "backend"}},
+                },
+                {
+                    "metadata": {"name": "worker"},
+                    "spec": {"selector": {"app": "worker", "tier": "backend"}},
+                },
+            ],
+        }
+        pods_output = (
+            "api-1\tdefault\tnode-1\tRunning\t2025-01-01T00:00:00Z\tapp=api,\n"
+            "worker-1\tdefault\tnode-1\tRunning\t2025-01-01T00:00:00Z\tapp=worker,\n"
+        )
+
+        mock_run.return_value = Mock(
+            stdout=json.dumps(services_output), returncode=0, stderr=""
         )
+        _set_popen_output(mock_popen, pods_output)
+
+        pods = get_pods_for_services(namespace="default", services=["api", "worker"])
+
+        assert [pod.name for pod in pods] == ["api-1", "worker-1"]
+        # One service lookup and one pod listing in total
+        assert mock_run.call_count == 1
+        assert mock_popen.call_count == 1
+        service_cmd = mock_run.call_args[0][0]
+        assert service_cmd[:5] == ["kubectl", "get", "service", "api", "worker"]
+        pods_cmd = mock_popen.call_args[0][0]
+        label_idx = pods_cmd.index("-l") + 1
+        assert pods_cmd[label_idx] == "app in (api,worker),tier=backend"
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_incompatible_selectors_query_per_service(
+        self, mock_run: Mock, mock_popen: Mock
+    ):
+        """Test that selectors with different keys fall back to one query each."""
+        services_output = {
+            "kind": "List",
+            "items": [
+                # Not in the order requested: results are matched up by name
+                {"metadata": {"name": "kn"}, "spec": {"type": "ExternalName"}},
+                {"metadata": {"name": "api"}, "spec": {"selector": {"app": "api"}}},
+            ],
+        }
+        shared_pod = "api-1\tdefault\tnode-1\tRunning\t2025-01-01T00:00:00Z\t\n"
+
+        mock_run.return_value = Mock(
+            stdout=json.dumps(services_output), returncode=0, stderr=""
+        )
+        mock_popen.side_effect = [_popen_output(shared_pod), _popen_output(shared_pod)]
+
+        pods = get_pods_for_services(namespace="default", services=["api", "kn"])
+
+        assert [pod.name for pod in pods] == ["api-1"]
+        assert mock_popen.call_count == 2
+        selectors = {
+            call[0][0][call[0][0].index("-l") + 1] for call in mock_popen.call_args_list
+        }
+        assert selectors == {"app=api", "serving.knative.dev/service=kn"}
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    @patch("subprocess.run", new_callable=Mock)
+    def test_no_services_lists_no_pods(self, mock_run: Mock, mock_popen: Mock):
+        """Test that an empty service list returns no pods without calling kubectl."""
+        assert get_pods_for_services(namespace="default", services=[]) == []
+        mock_run.assert_not_called()
+        mock_popen.assert_not_called()
 
 
 class TestListPythonProcesses:
-    """Tests for list_python_processes - ps aux parsing."""
-
-    @patch("subprocess.run")
-    def test_parses_ps_aux_output(self, mock_run: MagicMock):
-        """Test that ps aux output is parsed correctly."""
-        ps_output = """USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
-root         1  0.1  0.5  12345  6789 ?        Ss   10:00   0:01 /usr/bin/python3 /app/main.py --port 8080
-appuser     42  1.5  2.3  45678 12345 ?        Sl   10:01   0:15 python3 -m gunicorn app:application
-root       123  0.0  0.0   5678  1234 ?        R    10:30   0:00 ps aux"""
-
-        mock_result = MagicMock()
-        mock_result.stdout = ps_output
-        mock_run.return_value = mock_result
+    """Tests for list_python_processes - ps output parsing."""
+
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_parses_ps_output(self, mock_popen: Mock):
+        """Test that ps output is parsed correctly."""
+        ps_output = """root         1  0.1  0.5 /usr/bin/python3 /app/main.py --port 8080
+appuser     42  1.5  2.3 python3 -m gunicorn app:application
+root       123  0.0  0.0 ps -eo user=,pid=,pcpu=,pmem=,args=
+"""
+        _set_popen_output(mock_popen, ps_output)
 
         pod = PodInfo(
             "test-pod", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
         )
         processes = list_python_processes(pod)
 
-        assert len(processes) == 2  # Only Python processes, not 'ps aux'
+        assert len(processes) == 2  # Only Python processes, not 'ps' itself
 
         # First process
         assert processes[0].pid == 1
         assert processes[0].user == "root"
         assert processes[0].cpu_percent == 0.1
         assert processes[0].mem_percent == 0.5
-        assert "/usr/bin/python3 /app/main.py --port 8080" in processes[0].command
+        assert processes[0].command == "/usr/bin/python3 /app/main.py --port 8080"
 
         # Second process
         assert processes[1].pid == 42
@@ -252,16 +455,12 @@ root       123  0.0  0.0   5678  1234 ?        R    10:30   0:00 ps aux"""
         assert processes[1].mem_percent == 2.3
         assert "gunicorn" in processes[1].command
 
-    @patch("subprocess.run")
-    def test_handles_no_python_processes(self, mock_run: MagicMock):
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_handles_no_python_processes(self, mock_popen: Mock):
         """Test that empty list is returned when no Python processes found."""
-        ps_output = """USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
-root         1  0.0  0.1  12345  6789 ?        Ss   10:00   0:01 /bin/bash
-root        42  0.0  0.0   5678  1234 ?        R    10:30   0:00 ps aux"""
-
-        mock_result = MagicMock()
-        mock_result.stdout = ps_output
-        mock_run.return_value = mock_result
+        ps_output = """root         1  0.0  0.1 /bin/bash
+root        42  0.0  0.0 ps -eo user=,pid=,pcpu=,pmem=,args="""
+        _set_popen_output(mock_popen, ps_output)
 
         pod = PodInfo(
             "test-pod", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
@@ -270,6 +469,21 @@ root        42  0.0  0.0   5678  1234 ?        R    10:30   0:00 ps aux"""
 
         assert processes == []
 
+    @patch("subprocess.Popen", new_callable=Mock)
+    def test_failed_exec_raises_with_stderr(self, mock_popen: Mock):
+        """Test that a failing kubectl exec surfaces its stderr."""
+        _set_popen_output(
+            mock_popen, "", returncode=1, stderr='container "app" not found'
+        )
+
+        pod = PodInfo(
+            "test-pod", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
+        )
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            list_python_processes(pod)
+
+        assert exc_info.value.stderr == 'container "app" not found'
+
     def test_raises_error_for_non_running_pod(self):
         """Test that ValueError is raised for non-running pods."""
         pod = PodInfo(
@@ -283,10 +497,10 @@ root        42  0.0  0.0   5678  1234 ?        R    10:30   0:00 ps aux"""
 class TestExecCommand:
     """Tests for exec_command."""
 
-    @patch("subprocess.run")
-    def test_successful_command_execution(self, mock_run: MagicMock):
+    @patch("subprocess.run", new_callable=Mock)
+    def test_successful_command_execution(self, mock_run: Mock):
         """Test that successful command execution returns stdout."""
-        mock_result = MagicMock()
+        mock_result = Mock()
         mock_result.stdout = "Command output\n"
         mock_result.stderr = ""
         mock_result.returncode = 0
@@ -304,10 +518,10 @@ class TestExecCommand:
         assert call_args[:5] == ["kubectl", "exec", "test-pod", "-n", "default"]
         assert call_args[5:] == ["--", "echo", "hello"]
 
-    @patch("subprocess.run")
-    def test_failed_command_raises_error(self, mock_run: MagicMock):
+    @patch("subprocess.run", new_callable=Mock)
+    def test_failed_command_raises_error(self, mock_run: Mock):
         """Test that failed command raises CalledProcessError."""
-        mock_result = MagicMock()
+        mock_result = Mock()
         mock_result.stdout = ""
         mock_result.stderr = "Error: command not found"
         mock_result.returncode = 127
@@ -321,26 +535,168 @@ class TestExecCommand:
             exec_command(pod, ["nonexistent-command"])
 
 
-class TestCopyToPod:
-    """Tests for copy_to_pod."""
+class TestCopyFilesToPod:
+    """Tests for copy_files_to_pod."""
 
-    @patch("subprocess.run")
-    def test_copy_to_pod_calls_kubectl_cp(self, mock_run: MagicMock):
-        """Test that kubectl cp is called with correct arguments."""
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
+    @patch("subprocess.run", new_callable=Mock)
+    def test_copy_files_to_pod_streams_single_tar(self, mock_run: Mock, tmp_path: Path):
+        """Test that multiple files are sent as one tar archive over kubectl exec."""
+        attacher = tmp_path / "attacher.py"
+        attacher.write_text("print('attacher')")
+        script = tmp_path / "script.py"
+        script.write_text("print('script')")
 
         pod = PodInfo(
             "test-pod", "production", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
         )
-        copy_to_pod(pod, "/local/path/file.py", "/tmp/file.py")
+        copy_files_to_pod(
+            pod,
+            [(str(attacher), "/tmp/attacher.py"), (str(script), "/tmp/script.py")],
+        )
 
-        # Verify kubectl cp was called correctly
+        mock_run.assert_called_once()
         call_args = mock_run.call_args[0][0]
         assert call_args == [
             "kubectl",
-            "cp",
-            "/local/path/file.py",
-            "production/test-pod:/tmp/file.py",
+            "exec",
+            "-i",
+            "test-pod",
+            "-n",
+            "production",
+            "--",
+            "tar",
+            "-xmf",
+            "-",
+            "-C",
+            "/",
         ]
+
+        archive = io.BytesIO(mock_run.call_args.kwargs["input"])
+        with tarfile.open(fileobj=archive) as tar:
+            assert tar.getnames() == ["tmp/attacher.py", "tmp/script.py"]
+            member = tar.extractfile("tmp/script.py")
+            assert member is not None
+            assert member.read() == b"print('script')"
+            assert all(m.uid == 0 for m in tar.getmembers())
+
+    @patch("subprocess.run", new_callable=Mock)
+    def test_copy_files_to_pod_handler_reports_kubectl_error(
+        self, mock_run: Mock, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ):
+        """Test that a failed copy exits with kubectl's stderr instead of a traceback."""
+        script = tmp_path / "script.py"
+        script.write_text("print('script')")
+        mock_run.side_effect = subprocess.CalledProcessError(
+            1,
+            "kubectl exec",
+            stderr=b'exec: "tar": executable file not found in $PATH\n',
+        )
+
+        pod = PodInfo(
+            "test-pod", "production", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
+        )
+        with pytest.raises(typer.Exit) as exc_info:
+            copy_files_to_pod_handler(pod, [(str(script), "/tmp/script.py")])
+
+        assert exc_info.value.exit_code == 1
+        assert (
+            "Failed to copy files into pod 'test-pod': "
+            'exec: "tar": executable file not found in $PATH'
+        ) in capsys.readouterr().err
+
+
+class TestWaitForNewPod:
+    """Tests for wait_for_new_pod - polling backoff."""
+
+    @patch("debugwand.kubernetes.time", new_callable=Mock)
+    @patch("debugwand.kubernetes.get_pods_for_service", new_callable=Mock)
+    def test_backs_off_exponentially_until_timeout(
+        self, mock_get_pods: Mock, mock_time: Mock
+    ):
+        """Test that the poll interval doubles up to the cap and honours the timeout."""
+        mock_get_pods.return_value = []
+        clock = [0.0]
+        sleeps: list[float] = []
+
+        def fake_sleep(seconds: float):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        mock_time.monotonic.side_effect = lambda: clock[0]
+        mock_time.sleep.side_effect = fake_sleep
+
+        with pytest.raises(TimeoutError, match="my-service"):
+            wait_for_new_pod("my-service", "default", timeout=60)
+
+        assert sleeps == [1, 2, 4, 8, 15, 15, 15]
+        assert mock_get_pods.call_count == 8
+
+    @patch("debugwand.kubernetes.list_python_processes", new_callable=Mock)
+    @patch("debugwand.kubernetes.get_pods_for_service", new_callable=Mock)
+    def test_returns_first_pod_with_python_processes(
+        self, mock_get_pods: Mock, mock_list: Mock
+    ):
+        """Test that a running pod with Python processes is returned without sleeping."""
+        pod = PodInfo(
+            "new-pod", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
+        )
+        mock_get_pods.return_value = [pod]
+        mock_list.return_value = [ProcessInfo(1, "root", 0.1, 0.5, "python app.py")]
+
+        with patch("debugwand.kubernetes.time.sleep") as mock_sleep:
+            result = wait_for_new_pod("my-service", "default")
+
+        assert result == pod
+        mock_sleep.assert_not_called()
+
+
+class TestFindReplacementPod:
+    """Tests for find_replacement_pod - picking the newest candidate."""
+
+    @patch("debugwand.kubernetes.get_pods_for_service", new_callable=Mock)
+    def test_prefers_newest_pod_of_same_knative_service(self, mock_get_pods: Mock):
+        """Test that Knative pods of the same service win over newer unrelated pods."""
+        knative = "serving.knative.dev/service"
+        old_pod = PodInfo(
+            "app-00001-a",
+            "default",
+            "node-1",
+            "Running",
+            {knative: "app", "serving.knative.dev/revision": "app-00001"},
+            "2025-01-01T00:00:00Z",
+        )
+        mock_get_pods.return_value = [
+            old_pod,
+            PodInfo("app-00002-b", "default", "n", "Running", {knative: "app"}, ""),
+            PodInfo("app-00003-c", "default", "n", "Running", {knative: "app"}, ""),
+            PodInfo("app-00004-d", "default", "n", "Pending", {knative: "app"}, ""),
+            PodInfo("zzz-other", "default", "n", "Running", {knative: "other"}, ""),
+        ]
+
+        result = find_replacement_pod(old_pod, "app", "default")
+
+        assert result is not None
+        assert result.name == "app-00003-c"
+
+    @patch("debugwand.kubernetes.get_pods_for_service", new_callable=Mock)
+    def test_falls_back_to_newest_running_pod(self, mock_get_pods: Mock):
+        """Test that the newest running pod by name is returned without Knative labels."""
+        old_pod = PodInfo("app-1", "default", "n", "Running", {}, "")
+        mock_get_pods.return_value = [
+            old_pod,
+            PodInfo("app-3", "default", "n", "Running", {}, ""),
+            PodInfo("app-2", "default", "n", "Running", {}, ""),
+        ]
+
+        result = find_replacement_pod(old_pod, "app", "default")
+
+        assert result is not None
+        assert result.name == "app-3"
+
+    @patch("debugwand.kubernetes.get_pods_for_service", new_callable=Mock)
+    def test_no_candidates_returns_none(self, mock_get_pods: Mock):
+        """Test that None is returned when only the old pod is left."""
+        old_pod = PodInfo("app-1", "default", "n", "Running", {}, "")
+        mock_get_pods.return_value = [old_pod]
+
+        assert find_replacement_pod(old_pod, "app", "default") is None
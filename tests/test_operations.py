@@ -1,298 +1,368 @@
-from unittest.mock import MagicMock, mock_open, patch
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import Mock, patch
 
 import pytest
 
 from debugwand.kubernetes import (
     get_and_select_pod,
     get_and_select_process,
+    get_and_select_process_handler,
     monitor_worker_pid,
 )
-from debugwand.operations import prepare_debugpy_script
+from debugwand.operations import (
+    find_process_using_port,
+    is_main_process,
+    is_port_available,
+    iter_command_lines,
+    prepare_debugpy_script,
+)
 from debugwand.types import PodInfo, ProcessInfo
 
 
 class TestGetAndSelectPod:
     """Tests for get_and_select_pod function."""
 
-    @patch("debugwand.kubernetes.get_pods_for_service")
-    def test_no_pods_raises_error(self, mock_get_pods: MagicMock):
+    def test_no_pods_raises_error(self, monkeypatch: pytest.MonkeyPatch):
         """Test that ValueError is raised when no pods are found."""
-        mock_get_pods.return_value = []
+        monkeypatch.setattr(
+            "debugwand.kubernetes.get_pods_for_service", lambda **kwargs: []
+        )
 
         with pytest.raises(ValueError, match="No pods found matching the criteria"):
             get_and_select_pod(service="test-service", namespace="default")
 
-    @patch("debugwand.kubernetes.get_pods_for_service")
-    @patch("debugwand.kubernetes.select_pod")
     def test_single_pod_returned(
-        self, mock_select: MagicMock, mock_get_pods: MagicMock
+        self, monkeypatch: pytest.MonkeyPatch, sample_pod: PodInfo
     ):
         """Test that a single pod is returned successfully."""
-        pod = PodInfo(
-            name="pod-1",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test"},
-            creation_time="2025-01-01T00:00:00Z",
+        get_pods_calls: list[dict[str, str]] = []
+        select_calls: list[list[PodInfo]] = []
+        monkeypatch.setattr(
+            "debugwand.kubernetes.get_pods_for_service",
+            lambda **kwargs: get_pods_calls.append(kwargs) or [sample_pod],
+        )
+        monkeypatch.setattr(
+            "debugwand.kubernetes.select_pod",
+            lambda pods: select_calls.append(pods) or sample_pod,
         )
-        mock_get_pods.return_value = [pod]
-        mock_select.return_value = pod
 
         result = get_and_select_pod(service="test-service", namespace="default")
 
-        assert result == pod
-        mock_get_pods.assert_called_once_with(
-            service="test-service", namespace="default"
-        )
-        mock_select.assert_called_once_with([pod])
+        assert result == sample_pod
+        assert get_pods_calls == [{"service": "test-service", "namespace": "default"}]
+        assert select_calls == [[sample_pod]]
 
-    @patch("debugwand.kubernetes.get_pods_for_service")
-    @patch("debugwand.kubernetes.select_pod")
     def test_multiple_pods_calls_select(
-        self, mock_select: MagicMock, mock_get_pods: MagicMock
+        self, monkeypatch: pytest.MonkeyPatch, sample_pod: PodInfo
     ):
         """Test that select_pod is called when multiple pods exist."""
-        pod1 = PodInfo(
-            "pod-1",
-            "default",
-            "node-1",
-            "Running",
-            {"app": "test"},
-            "2025-01-01T00:00:00Z",
+        pod2 = replace(
+            sample_pod,
+            name="pod-2",
+            node_name="node-2",
+            creation_time="2025-01-01T01:00:00Z",
         )
-        pod2 = PodInfo(
-            "pod-2",
-            "default",
-            "node-2",
-            "Running",
-            {"app": "test"},
-            "2025-01-01T01:00:00Z",
+        select_calls: list[list[PodInfo]] = []
+        monkeypatch.setattr(
+            "debugwand.kubernetes.get_pods_for_service",
+            lambda **kwargs: [sample_pod, pod2],
+        )
+        # User selects first pod
+        monkeypatch.setattr(
+            "debugwand.kubernetes.select_pod",
+            lambda pods: select_calls.append(pods) or sample_pod,
         )
-
-        mock_get_pods.return_value = [pod1, pod2]
-        mock_select.return_value = pod1  # User selects first pod
 
         result = get_and_select_pod(service="test-service", namespace="default")
 
-        assert result == pod1
-        mock_select.assert_called_once_with([pod1, pod2])
+        assert result == sample_pod
+        assert select_calls == [[sample_pod, pod2]]
 
 
 class TestGetAndSelectProcess:
     """Tests for get_and_select_process function."""
 
-    @patch("debugwand.kubernetes.list_python_processes")
-    def test_no_processes_raises_error(self, mock_list: MagicMock):
-        """Test that ValueError is raised when no processes are found."""
-        mock_list.return_value = []
-        pod = PodInfo(
-            "pod-1", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
+    mock_list: Mock
+
+    @pytest.fixture(autouse=True)
+    def _patch_list_processes(self, monkeypatch: pytest.MonkeyPatch):
+        self.mock_list = Mock()
+        monkeypatch.setattr(
+            "debugwand.kubernetes.list_python_processes", self.mock_list
         )
 
+    def test_no_processes_raises_error(self, sample_pod: PodInfo):
+        """Test that ValueError is raised when no processes are found."""
+        self.mock_list.return_value = []
+
         with pytest.raises(ValueError, match="No Python processes found"):
-            get_and_select_process(pod, None)
+            get_and_select_process(sample_pod, None)
 
-    @patch("debugwand.kubernetes.list_python_processes")
-    def test_valid_pid_returned(self, mock_list: MagicMock):
+    def test_valid_pid_returned(self, sample_pod: PodInfo, sample_process: ProcessInfo):
         """Test that a valid PID is accepted and returned."""
-        process = ProcessInfo(
-            pid=1234,
-            user="root",
-            cpu_percent=0.5,
-            mem_percent=1.2,
-            command="python app.py",
-        )
-        mock_list.return_value = [process]
-        pod = PodInfo(
-            "pod-1", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
-        )
+        self.mock_list.return_value = [sample_process]
 
-        result = get_and_select_process(pod, 1234)
+        result = get_and_select_process(sample_pod, 1234)
 
         assert result == 1234
-        mock_list.assert_called_once_with(pod)
+        self.mock_list.assert_called_once_with(sample_pod)
 
-    @patch("debugwand.kubernetes.list_python_processes")
-    def test_invalid_pid_raises_error(self, mock_list: MagicMock):
+    def test_invalid_pid_raises_error(
+        self, sample_pod: PodInfo, sample_process: ProcessInfo
+    ):
         """Test that ValueError is raised for invalid PID."""
-        process = ProcessInfo(1234, "root", 0.5, 1.2, "python app.py")
-        mock_list.return_value = [process]
-        pod = PodInfo(
-            "pod-1", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
-        )
+        self.mock_list.return_value = [sample_process]
 
         with pytest.raises(ValueError, match="PID 9999 not found"):
-            get_and_select_process(pod, 9999)
+            get_and_select_process(sample_pod, 9999)
 
-    @patch("debugwand.kubernetes.list_python_processes")
-    @patch("debugwand.operations.select_pid")
     def test_no_pid_provided_calls_select(
-        self, mock_select: MagicMock, mock_list: MagicMock
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        sample_pod: PodInfo,
+        sample_process: ProcessInfo,
     ):
         """Test that select_pid is called when no PID is provided."""
-        process = ProcessInfo(1234, "root", 0.5, 1.2, "python app.py")
-        mock_list.return_value = [process]
-        mock_select.return_value = 1234
-        pod = PodInfo(
-            "pod-1", "default", "node-1", "Running", {}, "2025-01-01T00:00:00Z"
+        self.mock_list.return_value = [sample_process]
+        select_calls: list[list[ProcessInfo]] = []
+        monkeypatch.setattr(
+            "debugwand.kubernetes.select_pid",
+            lambda processes: select_calls.append(processes) or 1234,
         )
 
-        result = get_and_select_process(pod, None)
+        result = get_and_select_process(sample_pod, None)
 
         assert result == 1234
-        mock_select.assert_called_once_with([process])
+        assert select_calls == [[sample_process]]
 
+    def test_provided_processes_skip_listing(
+        self, sample_pod: PodInfo, sample_process: ProcessInfo
+    ):
+        """Test that already-listed processes are reused instead of re-listing."""
+        result = get_and_select_process(sample_pod, 1234, [sample_process])
 
-class TestPrepareDebugpyScript:
-    """Tests for prepare_debugpy_script function."""
+        assert result == 1234
+        self.mock_list.assert_not_called()
 
-    @patch(
-        "builtins.open",
-        new_callable=mock_open,
-        read_data="debugpy.listen({PORT})\nif {WAIT}: debugpy.wait_for_client()",
-    )
-    @patch("tempfile.NamedTemporaryFile")
-    def test_script_preparation_with_defaults(
-        self, mock_temp: MagicMock, mock_file: MagicMock
-    ):
-        """Test that script is prepared correctly with default values."""
-        # Mock temp file
-        temp_file = MagicMock()
-        temp_file.name = "/tmp/test_script.py"
-        mock_temp.return_value.__enter__.return_value = temp_file
-
-        result = prepare_debugpy_script(port=5679)
-
-        assert result == "/tmp/test_script.py"
-        # Verify the script content was modified correctly
-        temp_file.write.assert_called_once()
-        written_content = temp_file.write.call_args[0][0]
-        assert "5679" in written_content
-        assert "True" in written_content
-
-    @patch(
-        "builtins.open",
-        new_callable=mock_open,
-        read_data="debugpy.listen({PORT})\nif {WAIT}: debugpy.wait_for_client()",
-    )
-    @patch("tempfile.NamedTemporaryFile")
-    def test_script_preparation_custom_values(
-        self, mock_temp: MagicMock, mock_file: MagicMock
+    def test_handler_lists_processes_once(
+        self, sample_pod: PodInfo, sample_process: ProcessInfo
     ):
-        """Test that script is prepared with custom port and wait values."""
-        temp_file = MagicMock()
-        temp_file.name = "/tmp/custom_script.py"
-        mock_temp.return_value.__enter__.return_value = temp_file
+        """Test that the handler runs a single kubectl exec for listing and selection."""
+        self.mock_list.return_value = [sample_process]
 
-        result = prepare_debugpy_script(port=8080, wait=False)
+        result = get_and_select_process_handler(sample_pod, 1234)
 
-        assert result == "/tmp/custom_script.py"
-        written_content = temp_file.write.call_args[0][0]
-        assert "8080" in written_content
-        assert "False" in written_content
+        assert result == 1234
+        self.mock_list.assert_called_once_with(sample_pod)
 
 
-class TestMonitorWorkerPid:
-    """Tests for monitor_worker_pid function."""
+class TestIsMainProcess:
+    """Tests for is_main_process - command line classification."""
 
-    @patch("debugwand.kubernetes.list_python_processes")
-    @patch("debugwand.operations.detect_reload_mode")
-    def test_keeps_monitoring_when_worker_not_found(
-        self, mock_detect: MagicMock, mock_list_procs: MagicMock
-    ):
-        """Test that monitoring continues when worker process is temporarily not found.
-
-        This handles the case where a worker is frozen at a breakpoint or in transition,
-        and detect_reload_mode returns (True, None). The session should stay alive.
-        """
-        pod = PodInfo(
-            name="test-pod",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test"},
-            creation_time="2025-01-01T00:00:00Z",
+    def test_helper_processes_are_not_main(self):
+        """Test that multiprocessing helpers are excluded, even as PID 1."""
+        tracker = "python -c from multiprocessing.resource_tracker import main;main(5)"
+        assert not is_main_process(ProcessInfo(1, "root", 0.0, 0.1, tracker))
+        assert not is_main_process(
+            ProcessInfo(7, "root", 0.0, 0.1, "python -c from multiprocessing.spawn")
+        )
+
+    def test_main_process_indicators(self):
+        """Test that PID 1 and known server commands are treated as main."""
+        assert is_main_process(ProcessInfo(1, "root", 0.0, 0.1, "python worker.py"))
+        assert is_main_process(
+            ProcessInfo(8, "root", 0.0, 0.1, "/venv/bin/gunicorn app:app -w 4")
+        )
+        assert is_main_process(
+            ProcessInfo(9, "root", 0.0, 0.1, "python -m uvicorn app:app")
         )
+        assert not is_main_process(ProcessInfo(10, "root", 0.0, 0.1, "python job.py"))
+
+
+class TestIsPortAvailable:
+    """Tests for is_port_available function."""
+
+    def test_listening_port_is_not_available(self):
+        """Test that a port with an active listener is reported as in use."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen()
+            port = server.getsockname()[1]
+
+            assert is_port_available(port) is False
 
-        # Simulate reload mode detected but worker process not found
-        # (e.g., worker frozen at breakpoint)
-        mock_list_procs.return_value = [
-            ProcessInfo(
-                pid=1,
-                user="root",
-                cpu_percent=0.1,
-                mem_percent=0.5,
-                command="python -m fastapi run app/api/main.py --reload",
-            )
+    def test_closed_port_is_available(self):
+        """Test that a port nobody is listening on is reported as available."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(("127.0.0.1", 0))
+            port = server.getsockname()[1]
+
+        assert is_port_available(port) is True
+
+
+class TestFindProcessUsingPort:
+    """Tests for find_process_using_port - lsof field output parsing."""
+
+    @patch("subprocess.run", new_callable=Mock)
+    def test_listener_found_with_full_command(self, mock_run: Mock):
+        """Test that the listening PID is resolved to its full command line."""
+        mock_run.side_effect = [
+            Mock(returncode=0, stdout="p4321\nckubectl\nf7\n"),
+            Mock(returncode=0, stdout="kubectl port-forward pod-1 5679:5679\n"),
         ]
-        mock_detect.return_value = (True, None)  # is_reload=True, worker_proc=None
 
-        result = monitor_worker_pid(pod, initial_pid=123)
+        result = find_process_using_port(5679)
+
+        assert result == (4321, "kubectl port-forward pod-1 5679:5679")
+        lsof_args = mock_run.call_args_list[0][0][0]
+        assert lsof_args[0] == "lsof"
+        assert "-sTCP:LISTEN" in lsof_args
+        assert mock_run.call_args_list[1][0][0] == [
+            "ps",
+            "-p",
+            "4321",
+            "-o",
+            "command=",
+        ]
 
-        # Should return initial_pid to keep monitoring, not None
-        assert result == 123
-        mock_list_procs.assert_called_once_with(pod)
-        mock_detect.assert_called_once()
+    @patch("subprocess.run", new_callable=Mock)
+    def test_falls_back_to_any_connection(self, mock_run: Mock):
+        """Test that lsof is retried without the LISTEN filter when nothing listens."""
+        mock_run.side_effect = [
+            Mock(returncode=1, stdout=""),
+            Mock(returncode=0, stdout="p99\ncpython3\n"),
+            Mock(returncode=1, stdout=""),
+        ]
 
-    @patch("debugwand.kubernetes.list_python_processes")
-    @patch("debugwand.operations.detect_reload_mode")
-    def test_detects_pid_change(
-        self, mock_detect: MagicMock, mock_list_procs: MagicMock
-    ):
-        """Test that PID change is detected when worker restarts."""
-        pod = PodInfo(
-            name="test-pod",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test"},
-            creation_time="2025-01-01T00:00:00Z",
-        )
+        result = find_process_using_port(8080)
 
-        new_worker = ProcessInfo(
-            pid=456,
-            user="root",
-            cpu_percent=0.2,
-            mem_percent=1.0,
-            command="python -c from multiprocessing.spawn import spawn_main",
+        assert result == (99, "python3")
+        assert "-sTCP:LISTEN" not in mock_run.call_args_list[1][0][0]
+
+
+class TestIterCommandLines:
+    """Tests for iter_command_lines against a real child process."""
+
+    def test_large_stderr_does_not_block(self):
+        """Test that stderr beyond a pipe buffer doesn't deadlock the stdout read."""
+        script = "import sys; sys.stderr.write('x' * 200_000); print('done')"
+        lines: list[str] = []
+        reader = threading.Thread(
+            target=lambda: lines.extend(
+                iter_command_lines([sys.executable, "-c", script])
+            ),
+            daemon=True,
         )
 
-        mock_list_procs.return_value = [new_worker]
-        mock_detect.return_value = (True, new_worker)
+        reader.start()
+        reader.join(timeout=10)
+
+        assert not reader.is_alive()
+        assert lines == ["done"]
 
-        result = monitor_worker_pid(pod, initial_pid=123)
+    def test_failure_raises_with_stderr(self):
+        """Test that a non-zero exit raises CalledProcessError carrying stderr."""
+        script = "import sys; sys.stderr.write('boom'); sys.exit(3)"
 
-        # Should return new PID
-        assert result == 456
+        with pytest.raises(subprocess.CalledProcessError) as exc_info:
+            list(iter_command_lines([sys.executable, "-c", script]))
+
+        assert exc_info.value.returncode == 3
+        assert exc_info.value.stderr == "boom"
+
+
+class TestPrepareDebugpyScript:
+    """Tests for prepare_debugpy_script function."""
 
-    @patch("debugwand.kubernetes.list_python_processes")
-    @patch("debugwand.operations.detect_reload_mode")
-    def test_stops_monitoring_when_not_reload_mode(
-        self, mock_detect: MagicMock, mock_list_procs: MagicMock
+    @pytest.fixture(autouse=True)
+    def _small_template_in_tmp_path(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
     ):
-        """Test that monitoring stops when reload mode is no longer detected."""
-        pod = PodInfo(
-            name="test-pod",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test"},
-            creation_time="2025-01-01T00:00:00Z",
+        """Render a minimal template, writing the script into tmp_path."""
+        monkeypatch.setattr(
+            "debugwand.operations._DEBUGPY_TEMPLATE",
+            "debugpy.listen({PORT})\nif {WAIT}: debugpy.wait_for_client()",
         )
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    @pytest.mark.parametrize(
+        ("kwargs", "expected"),
+        [
+            # Defaults
+            (
+                {"port": 5679},
+                "debugpy.listen(5679)\nif True: debugpy.wait_for_client()",
+            ),
+            # Custom port and wait values
+            (
+                {"port": 8080, "wait": False},
+                "debugpy.listen(8080)\nif False: debugpy.wait_for_client()",
+            ),
+        ],
+    )
+    def test_script_preparation(
+        self, tmp_path: Path, kwargs: dict[str, int | bool], expected: str
+    ):
+        """Test that the port and wait settings are substituted into the script."""
+        result = prepare_debugpy_script(**kwargs)
 
-        mock_list_procs.return_value = [
-            ProcessInfo(
-                pid=1,
-                user="root",
-                cpu_percent=0.1,
-                mem_percent=0.5,
-                command="python app.py",  # No --reload
-            )
-        ]
-        mock_detect.return_value = (False, None)
+        assert Path(result).parent == tmp_path
+        assert Path(result).read_text() == expected
+
+
+_RELOAD_MAIN = ProcessInfo(
+    1, "root", 0.5, 1.2, "python -m fastapi run app/api/main.py --reload"
+)
+_SPAWNED_WORKER = ProcessInfo(
+    456, "root", 0.5, 1.2, "python -c from multiprocessing.spawn import spawn_main"
+)
+_PLAIN_MAIN = ProcessInfo(1, "root", 0.5, 1.2, "python app.py")
 
-        result = monitor_worker_pid(pod, initial_pid=123)
 
-        # Should return None to stop monitoring
-        assert result is None
+class TestMonitorWorkerPid:
+    """Tests for monitor_worker_pid function."""
+
+    mock_list: Mock
+    mock_detect: Mock
+
+    @pytest.fixture(autouse=True)
+    def _patch_process_lookups(self, monkeypatch: pytest.MonkeyPatch):
+        self.mock_list = Mock()
+        self.mock_detect = Mock()
+        monkeypatch.setattr(
+            "debugwand.kubernetes.list_python_processes", self.mock_list
+        )
+        monkeypatch.setattr("debugwand.kubernetes.detect_reload_mode", self.mock_detect)
+
+    @pytest.mark.parametrize(
+        "processes, detect_return, expected",
+        [
+            # Reload mode but the worker is missing, e.g. frozen at a breakpoint
+            # or mid-restart: keep the session alive on the initial PID.
+            ([_RELOAD_MAIN], (True, None), 123),
+            # Worker restarted under a new PID.
+            ([_SPAWNED_WORKER], (True, _SPAWNED_WORKER), 456),
+            # No longer in reload mode: stop monitoring.
+            ([_PLAIN_MAIN], (False, None), None),
+        ],
+        ids=["worker_not_found", "pid_changed", "not_reload_mode"],
+    )
+    def test_monitor_worker_pid(
+        self,
+        sample_pod: PodInfo,
+        processes: list[ProcessInfo],
+        detect_return: tuple[bool, ProcessInfo | None],
+        expected: int | None,
+    ):
+        self.mock_list.return_value = processes
+        self.mock_detect.return_value = detect_return
+
+        assert monitor_worker_pid(sample_pod, initial_pid=123) == expected
+        self.mock_list.assert_called_once_with(sample_pod)
+        self.mock_detect.assert_called_once_with(processes)
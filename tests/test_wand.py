@@ -1,13 +1,18 @@
-import os
+import io
 import subprocess
-import tempfile
+import threading
 import unittest
-from unittest.mock import MagicMock, patch
+from collections.abc import Callable
+from dataclasses import replace
+from pathlib import Path
+from typing import NoReturn
+from unittest.mock import MagicMock, Mock, patch
 
+import pytest
 from typer import Exit
 from typer.testing import CliRunner
 
-from debugwand.cli import app
+from debugwand.cli import _monitor_and_handle_reload_mode, app
 from debugwand.container import (
     detect_runtime,
     list_python_processes,
@@ -16,41 +21,41 @@ from debugwand.container import (
 from debugwand.operations import detect_reload_mode
 from debugwand.types import PodInfo, ProcessInfo
 
-runner = CliRunner()
 
+def _raising(exc: BaseException) -> Callable[..., NoReturn]:
+    """A stand-in for a patched callable that always raises `exc`."""
 
+    def raise_(*args: object, **kwargs: object) -> NoReturn:
+        raise exc
+
+    return raise_
+
+
+@pytest.mark.xdist_group("cli")
 class TestPodsCommand:
     """Tests for the 'pods' command."""
 
-    @patch("debugwand.kubernetes.get_pods_for_service_handler")
-    def test_pods_no_pods_found(self, mock_get_pods: MagicMock):
+    def test_pods_no_pods_found(self, cli_runner: CliRunner, mock_get_pods: Mock):
         mock_get_pods.side_effect = Exit(1)
-        result = runner.invoke(
+        result = cli_runner.invoke(
             app, ["pods", "--namespace", "default", "--service", "test-service"]
         )
         assert result.exit_code == 1
 
         mock_get_pods.assert_called_once_with("default", "test-service")
 
-    @patch("debugwand.kubernetes.get_pods_for_service_handler")
-    @patch("debugwand.kubernetes.list_python_processes_handler")
+    @patch("debugwand.kubernetes.list_python_processes_handler", new_callable=Mock)
     def test_pods_with_pids_no_processes(
-        self, mock_list_procs_handler: MagicMock, mock_get_pods: MagicMock
+        self,
+        mock_list_procs_handler: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        sample_pod: PodInfo,
     ):
-        """Test the 'pods' command with --with-pids when pods have no Python processes."""
-        mock_pod = PodInfo(
-            name="pod-1",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test-app"},
-            creation_time="2025-01-01T00:00:00Z",
-        )
-
-        mock_get_pods.return_value = [mock_pod]
+        mock_get_pods.return_value = [sample_pod]
         mock_list_procs_handler.return_value = None
 
-        result = runner.invoke(
+        result = cli_runner.invoke(
             app,
             [
                 "pods",
@@ -66,35 +71,21 @@ class TestPodsCommand:
         assert "No running pods with Python processes found" in result.stderr
 
         mock_get_pods.assert_called_once_with("default", "test-service")
-        mock_list_procs_handler.assert_called_once_with(mock_pod)
+        mock_list_procs_handler.assert_called_once_with(sample_pod)
 
-    @patch("debugwand.kubernetes.get_pods_for_service_handler")
-    @patch("debugwand.kubernetes.list_python_processes_handler")
+    @patch("debugwand.kubernetes.list_python_processes_handler", new_callable=Mock)
     def test_pods_with_pids_with_processes(
-        self, mock_list_procs_handler: MagicMock, mock_get_pods: MagicMock
+        self,
+        mock_list_procs_handler: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        sample_pod: PodInfo,
+        sample_process: ProcessInfo,
     ):
-        """Test the 'pods' command with --with-pids when pods have Python processes."""
-        mock_pod = PodInfo(
-            name="pod-1",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test-app"},
-            creation_time="2025-01-01T00:00:00Z",
-        )
+        mock_get_pods.return_value = [sample_pod]
+        mock_list_procs_handler.return_value = [sample_process]
 
-        mock_process = ProcessInfo(
-            pid=1234,
-            user="root",
-            cpu_percent=0.5,
-            mem_percent=1.2,
-            command="python app.py",
-        )
-
-        mock_get_pods.return_value = [mock_pod]
-        mock_list_procs_handler.return_value = [mock_process]
-
-        result = runner.invoke(
+        result = cli_runner.invoke(
             app,
             [
                 "pods",
@@ -112,16 +103,192 @@ class TestPodsCommand:
         assert "python app.py" in result.stdout
 
         mock_get_pods.assert_called_once_with("default", "test-service")
-        mock_list_procs_handler.assert_called_once_with(mock_pod)
+        mock_list_procs_handler.assert_called_once_with(sample_pod)
+
+    @patch("debugwand.kubernetes.list_python_processes_handler", new_callable=Mock)
+    def test_pods_with_pids_keeps_brackets_in_commands(
+        self,
+        mock_list_procs_handler: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        sample_pod: PodInfo,
+        sample_process: ProcessInfo,
+    ):
+        """Test that process commands are rendered literally, not as Rich markup."""
+        monkeypatch.setattr("debugwand.ui._use_plain_output", lambda: False)
+        mock_get_pods.return_value = [sample_pod]
+        mock_list_procs_handler.return_value = [
+            replace(sample_process, command="python app.py --tags [bold]")
+        ]
+
+        result = cli_runner.invoke(
+            app,
+            [
+                "pods",
+                "--namespace",
+                "default",
+                "--service",
+                "test-service",
+                "--with-pids",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "python app.py --tags [bold]" in result.stdout
+
+    @patch("debugwand.kubernetes.list_python_processes_handler", new_callable=Mock)
+    def test_pods_with_pids_labels_process_types(
+        self,
+        mock_list_procs_handler: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        sample_pod: PodInfo,
+    ):
+        """Test that helper, worker and debugger processes are labelled."""
+        mock_get_pods.return_value = [sample_pod]
+        mock_list_procs_handler.return_value = [
+            ProcessInfo(1, "root", 0.5, 1.2, "python app.py"),
+            ProcessInfo(
+                7, "root", 0.0, 0.1, "python -c from multiprocessing.resource_tracker"
+            ),
+            ProcessInfo(8, "root", 0.0, 0.1, "python -c from multiprocessing.spawn"),
+            ProcessInfo(9, "root", 0.0, 0.1, "python /usr/lib/debugpy/adapter"),
+        ]
+
+        result = cli_runner.invoke(
+            app,
+            [
+                "pods",
+                "--namespace",
+                "default",
+                "--service",
+                "test-service",
+                "--with-pids",
+            ],
+        )
+
+        assert result.exit_code == 0
+        for label in ("MAIN", "helper", "worker", "debugger"):
+            assert label in result.stdout
+
+    @patch("debugwand.kubernetes.list_python_processes_handler", new_callable=Mock)
+    def test_pods_with_pids_truncates_long_commands(
+        self,
+        mock_list_procs_handler: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        sample_pod: PodInfo,
+    ):
+        """Test that commands longer than 80 characters are cut with an ellipsis."""
+        monkeypatch.setattr("debugwand.ui._use_plain_output", lambda: False)
+        mock_get_pods.return_value = [sample_pod]
+        mock_list_procs_handler.return_value = [
+            ProcessInfo(
+                1, "root", 0.5, 1.2, "python app.py" + " --flag" * 15 + " TAIL"
+            ),
+        ]
+
+        result = cli_runner.invoke(
+            app,
+            [
+                "pods",
+                "--namespace",
+                "default",
+                "--service",
+                "test-service",
+                "--with-pids",
+            ],
+        )
 
+        assert result.exit_code == 0
+        # The column wraps long text, so the tail would show if it weren't cut
+        assert "TAIL" not in result.stdout
+
+    @patch("debugwand.kubernetes.list_python_processes_handler", new_callable=Mock)
+    def test_pods_with_pids_plain_output(
+        self,
+        mock_list_procs_handler: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        sample_pod: PodInfo,
+    ):
+        """Test that non-terminal output is tab-separated with full values."""
+        long_name = "pod-with-a-very-long-generated-name-abc12"
+        mock_get_pods.return_value = [replace(sample_pod, name=long_name)]
+        command = "python app.py" + " --flag" * 15
+        mock_list_procs_handler.return_value = [
+            ProcessInfo(1, "root", 0.5, 1.2, command),
+            ProcessInfo(7, "root", 0.0, 0.1, "python -c from multiprocessing.spawn"),
+        ]
+
+        result = cli_runner.invoke(
+            app,
+            [
+                "pods",
+                "--namespace",
+                "default",
+                "--service",
+                "test-service",
+                "--with-pids",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert result.stdout.splitlines() == [
+            "Pod\tPID\tType\tCommand",
+            f"{long_name}\t1\t⭐ MAIN\t{command}",
+            f"{long_name}\t7\tworker\tpython -c from multiprocessing.spawn",
+        ]
+
+    @patch("debugwand.kubernetes.list_python_processes_handler", new_callable=Mock)
+    def test_pods_with_pids_concurrent(
+        self,
+        mock_list_procs_handler: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        sample_pod: PodInfo,
+    ):
+        """Test that processes are listed in all pods concurrently, in pod order."""
+        pods = [replace(sample_pod, name=f"pod-{i}") for i in range(4)]
+        # Every call blocks until all four are in flight at once; a serial loop
+        # would time out on the first call and break the barrier
+        barrier = threading.Barrier(len(pods), timeout=5)
 
+        def list_procs(pod: PodInfo) -> list[ProcessInfo]:
+            barrier.wait()
+            pid = 1000 + int(pod.name.split("-")[1])
+            return [ProcessInfo(pid, "root", 0.5, 1.2, "python app.py")]
+
+        mock_get_pods.return_value = pods
+        mock_list_procs_handler.side_effect = list_procs
+
+        result = cli_runner.invoke(
+            app,
+            [
+                "pods",
+                "--namespace",
+                "default",
+                "--service",
+                "test-service",
+                "--with-pids",
+            ],
+        )
+
+        assert result.exit_code == 0
+        positions = [result.stdout.index(f"pod-{i}") for i in range(4)]
+        assert positions == sorted(positions)
+        assert "1003" in result.stdout
+
+
+@pytest.mark.xdist_group("cli")
 class TestInjectCommand:
     """Tests for the 'inject' command."""
 
-    @patch("debugwand.kubernetes.get_pods_for_service_handler")
-    def test_inject_no_pods_found(self, mock_get_pods_handler: MagicMock):
-        mock_get_pods_handler.side_effect = Exit(1)
-        result = runner.invoke(
+    def test_inject_no_pods_found(self, cli_runner: CliRunner, mock_get_pods: Mock):
+        mock_get_pods.side_effect = Exit(1)
+        result = cli_runner.invoke(
             app,
             [
                 "inject",
@@ -135,109 +302,88 @@ class TestInjectCommand:
         )
         assert result.exit_code == 1
 
-        mock_get_pods_handler.assert_called_once_with("default", "test-service")
+        mock_get_pods.assert_called_once_with("default", "test-service")
 
-    @patch("debugwand.kubernetes.get_pods_for_service_handler")
-    @patch("debugwand.kubernetes.list_python_processes_handler")
-    @patch("debugwand.kubernetes.select_pod")
-    @patch("debugwand.kubernetes.get_and_select_process")
-    @patch("debugwand.kubernetes.copy_to_pod")
-    @patch("debugwand.kubernetes.exec_command")
+    @patch("debugwand.kubernetes.copy_files_to_pod", new_callable=Mock)
+    @patch("debugwand.kubernetes.exec_command", new_callable=Mock)
     def test_inject_successful_injection(
         self,
-        mock_exec_cmd: MagicMock,
-        mock_copy_to_pod: MagicMock,
-        mock_select_process: MagicMock,
-        mock_select_pod: MagicMock,
-        mock_list_procs: MagicMock,
-        mock_get_pods_handler: MagicMock,
+        mock_exec_cmd: Mock,
+        mock_copy_files: Mock,
+        cli_runner: CliRunner,
+        mock_get_pods: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        sample_pod: PodInfo,
+        sample_process: ProcessInfo,
     ):
-        mock_pod = PodInfo(
-            name="pod-1",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test-app"},
-            creation_time="2025-01-01T00:00:00Z",
+        mock_get_pods.return_value = [sample_pod]
+        monkeypatch.setattr(
+            "debugwand.kubernetes.list_python_processes_handler",
+            lambda pod: [sample_process],
         )
+        monkeypatch.setattr("debugwand.kubernetes.select_pod", lambda pods: sample_pod)
+        monkeypatch.setattr(
+            "debugwand.kubernetes.get_and_select_process", lambda *args: 1234
+        )
+        mock_exec_cmd.return_value = "Injection successful"
 
-        mock_process = ProcessInfo(
-            pid=1234,
-            user="root",
-            cpu_percent=0.5,
-            mem_percent=1.2,
-            command="python app.py",
+        result = cli_runner.invoke(
+            app,
+            [
+                "inject",
+                "--namespace",
+                "default",
+                "--service",
+                "test-service",
+                "--script",
+                "/path/to/script.py",
+            ],
         )
+        assert result.exit_code == 0
+        assert "Executing script '/path/to/script.py'" in result.stdout
 
-        mock_get_pods_handler.return_value = [mock_pod]
-        mock_list_procs.return_value = [mock_process]
-        mock_select_pod.return_value = mock_pod
-        mock_select_process.return_value = 1234
-        mock_exec_cmd.return_value = "Injection successful"
+        mock_copy_files.assert_called_once()
+        copied = [remote for _, remote in mock_copy_files.call_args[0][1]]
+        assert copied == ["/tmp/script.py", "/tmp/attacher.py"]
+        mock_exec_cmd.assert_called()
 
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".py", delete=False
-        ) as temp_script:
-            temp_script.write("print('Hello from injected script')")
-            temp_script_path = temp_script.name
-
-        try:
-            result = runner.invoke(
-                app,
-                [
-                    "inject",
-                    "--namespace",
-                    "default",
-                    "--service",
-                    "test-service",
-                    "--script",
-                    "/path/to/script.py",
-                ],
-            )
-            assert result.exit_code == 0
-            assert "Executing script '/path/to/script.py'" in result.stdout
-
-            mock_copy_to_pod.assert_called()
-            mock_exec_cmd.assert_called()
-        finally:
-            os.unlink(temp_script_path)
 
+_NEED_TARGET = "Either --container or both --namespace and --service are required"
+_NO_MIXING = "Cannot use --namespace or --service with --container"
 
+
+@pytest.mark.xdist_group("cli")
 class TestDebugCommand:
     """Tests for the 'debug' command."""
 
-    @patch("debugwand.kubernetes.get_and_select_pod_handler")
-    def test_debug_no_pods_found(self, mock_get_and_select_pod_handler: MagicMock):
+    def test_debug_no_pods_found(
+        self, cli_runner: CliRunner, monkeypatch: pytest.MonkeyPatch
+    ):
         # Handler raises Exit when no pods found
-        mock_get_and_select_pod_handler.side_effect = Exit(1)
+        monkeypatch.setattr(
+            "debugwand.kubernetes.get_and_select_pod_handler", _raising(Exit(1))
+        )
 
-        result = runner.invoke(
+        result = cli_runner.invoke(
             app, ["debug", "--namespace", "default", "--service", "my-service"]
         )
 
         assert result.exit_code == 1
 
-    @patch("debugwand.kubernetes.get_and_select_pod_handler")
-    @patch("debugwand.kubernetes.get_and_select_process_handler")
     def test_debug_invalid_pid(
         self,
-        mock_get_and_select_process_handler: MagicMock,
-        mock_get_and_select_pod_handler: MagicMock,
+        cli_runner: CliRunner,
+        monkeypatch: pytest.MonkeyPatch,
+        sample_pod: PodInfo,
     ):
-        """Test debug with an invalid PID."""
-        mock_pod = PodInfo(
-            name="pod-1",
-            namespace="default",
-            node_name="node-1",
-            status="Running",
-            labels={"app": "test-app"},
-            creation_time="2025-01-01T00:00:00Z",
+        monkeypatch.setattr(
+            "debugwand.kubernetes.get_and_select_pod_handler", lambda *args: sample_pod
+        )
+        monkeypatch.setattr(
+            "debugwand.kubernetes.get_and_select_process_handler", _raising(Exit(1))
         )
 
-        mock_get_and_select_pod_handler.return_value = mock_pod
-        mock_get_and_select_process_handler.side_effect = Exit(1)
-
-        result = runner.invoke(
+        result = cli_runner.invoke(
             app,
             [
                 "debug",
@@ -252,50 +398,84 @@ class TestDebugCommand:
 
         assert result.exit_code == 1
 
-    def test_debug_requires_container_or_namespace_service(self):
-        """Test that debug command requires either --container or --namespace + --service."""
-        result = runner.invoke(app, ["debug"])
+    @pytest.mark.parametrize(
+        "argv, message",
+        [
+            (["debug"], _NEED_TARGET),
+            (["debug", "--namespace", "default"], _NEED_TARGET),
+            (["debug", "--service", "my-service"], _NEED_TARGET),
+            (
+                ["debug", "--container", "my-container", "--namespace", "default"],
+                _NO_MIXING,
+            ),
+            (
+                ["debug", "--container", "my-container", "--service", "my-service"],
+                _NO_MIXING,
+            ),
+        ],
+    )
+    def test_debug_argument_validation(
+        self, cli_runner: CliRunner, argv: list[str], message: str
+    ):
+        """Test that debug needs --container or both --namespace and --service, not a mix."""
+        result = cli_runner.invoke(app, argv)
         assert result.exit_code == 1
-        assert "Either --container or both --namespace and --service are required" in result.stderr
+        assert message in result.stderr
 
-    def test_debug_requires_both_namespace_and_service(self):
-        """Test that debug command requires both namespace and service for k8s mode."""
-        result = runner.invoke(app, ["debug", "--namespace", "default"])
-        assert result.exit_code == 1
-        assert "Either --container or both --namespace and --service are required" in result.stderr
+    def test_reinject_copy_failure_reports_kubectl_error(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        tmp_path: Path,
+        sample_pod: PodInfo,
+    ):
+        """Test that a failed copy on worker restart shows kubectl's stderr and
+        hands back to the reconnect loop instead of raising."""
+        script = tmp_path / "debugpy_script.py"
+        script.write_text("")
+        monkeypatch.setattr("debugwand.kubernetes.list_python_processes", Mock())
+        monkeypatch.setattr(
+            "debugwand.cli.detect_reload_mode", lambda processes: (True, None)
+        )
+        monkeypatch.setattr(
+            "debugwand.kubernetes.monitor_worker_pid", lambda pod, pid: 456
+        )
+        monkeypatch.setattr(
+            "debugwand.cli.prepare_debugpy_script", lambda port, wait: str(script)
+        )
+        monkeypatch.setattr(
+            "debugwand.kubernetes.copy_files_to_pod",
+            _raising(
+                subprocess.CalledProcessError(
+                    1, "kubectl exec", stderr=b"error: unable to upgrade connection\n"
+                )
+            ),
+        )
+        port_forward = Mock()
+        port_forward.poll.return_value = None
 
-        result = runner.invoke(app, ["debug", "--service", "my-service"])
-        assert result.exit_code == 1
-        assert "Either --container or both --namespace and --service are required" in result.stderr
+        result = _monitor_and_handle_reload_mode(sample_pod, 123, 5679, port_forward)
 
-    def test_debug_container_cannot_mix_with_k8s_options(self):
-        """Test that debug --container cannot be used with --namespace or --service."""
-        result = runner.invoke(
-            app, ["debug", "--container", "my-container", "--namespace", "default"]
-        )
-        assert result.exit_code == 1
-        assert "Cannot use --namespace or --service with --container" in result.stderr
+        assert result == (123, False)
+        assert "unable to upgrade connection" in capsys.readouterr().out
 
-        result = runner.invoke(
-            app, ["debug", "--container", "my-container", "--service", "my-service"]
-        )
-        assert result.exit_code == 1
-        assert "Cannot use --namespace or --service with --container" in result.stderr
 
+# `ps -eo user=,pid=,pcpu=,pmem=,args=` output: no header, one process per line
+_PS_TWO_PY = (
+    "root         1  0.5  1.2 python app.py\n"
+    "root        10  0.1  0.5 python worker.py\n"
+)
 
+
+@pytest.mark.xdist_group("container")
 class TestContainerSupport:
     """Tests for container debugging support."""
 
-    @patch("debugwand.container.subprocess.run")
-    def test_list_python_processes_in_container(self, mock_run: MagicMock):
-        """Test listing Python processes in a container."""
-        mock_run.return_value = MagicMock(
-            stdout="""USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
-root         1  0.5  1.2 123456 12345 ?        Ss   10:00   0:01 python app.py
-root        10  0.1  0.5  65432  6543 ?        S    10:01   0:00 python worker.py
-""",
-            returncode=0,
-        )
+    @patch("subprocess.Popen")
+    def test_list_python_processes_in_container(self, mock_popen: MagicMock):
+        proc = mock_popen.return_value.__enter__.return_value
+        proc.stdout = io.StringIO(_PS_TWO_PY)
+        proc.returncode = 0
 
         processes = list_python_processes("docker", "test-container")
 
@@ -305,75 +485,74 @@ root        10  0.1  0.5  65432  6543 ?        S    10:01   0:00 python worker.p
         assert processes[1].pid == 10
         assert processes[1].command == "python worker.py"
 
-        mock_run.assert_called_once_with(
-            ["docker", "exec", "test-container", "ps", "aux"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+        assert mock_popen.call_args[0][0] == [
+            "docker",
+            "exec",
+            "test-container",
+            "ps",
+            "-eo",
+            "user=,pid=,pcpu=,pmem=,args=",
+        ]
 
-    @patch("debugwand.container.subprocess.run")
-    def test_list_python_processes_in_container_no_python(self, mock_run: MagicMock):
-        """Test listing processes when no Python processes exist."""
-        mock_run.return_value = MagicMock(
-            stdout="""USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
-root         1  0.5  1.2 123456 12345 ?        Ss   10:00   0:01 nginx
-""",
-            returncode=0,
-        )
+    @patch("subprocess.Popen")
+    def test_list_python_processes_in_container_no_python(self, mock_popen: MagicMock):
+        proc = mock_popen.return_value.__enter__.return_value
+        proc.stdout = io.StringIO("root         1  0.5  1.2 nginx\n")
+        proc.returncode = 0
 
         processes = list_python_processes("docker", "test-container")
         assert len(processes) == 0
 
-    @patch("debugwand.container.list_python_processes")
-    def test_debug_container_no_processes(self, mock_list_procs: MagicMock):
-        """Test debug --container when no Python processes found."""
-        mock_list_procs.return_value = []
+    def test_debug_container_no_processes(
+        self, cli_runner: CliRunner, mock_container_procs: Mock
+    ):
+        mock_container_procs.return_value = []
 
-        result = runner.invoke(app, ["debug", "--container", "test-container"])
+        result = cli_runner.invoke(app, ["debug", "--container", "test-container"])
 
         assert result.exit_code == 1
         assert "No Python processes found" in result.stderr
 
-    @patch("debugwand.container.list_python_processes")
-    def test_debug_container_invalid_pid(self, mock_list_procs: MagicMock):
-        """Test debug --container with a PID that doesn't exist."""
-        mock_list_procs.return_value = [
-            ProcessInfo(
-                pid=1, user="root", cpu_percent=0.5, mem_percent=1.2, command="python app.py"
-            )
-        ]
+    def test_debug_container_invalid_pid(
+        self,
+        cli_runner: CliRunner,
+        mock_container_procs: Mock,
+        sample_process: ProcessInfo,
+    ):
+        mock_container_procs.return_value = [replace(sample_process, pid=1)]
 
-        result = runner.invoke(
+        result = cli_runner.invoke(
             app, ["debug", "--container", "test-container", "--pid", "999"]
         )
 
         assert result.exit_code == 1
         assert "PID 999 not found" in result.stderr
 
-    @patch("debugwand.container.list_python_processes")
-    @patch("debugwand.container.inject_debugpy")
-    @patch("debugwand.container.prepare_debugpy_script")
-    @patch("debugwand.container.print_connection_info")
+    @patch("debugwand.container.inject_debugpy", new_callable=Mock)
     def test_debug_container_auto_selects_single_process(
         self,
-        mock_print_conn: MagicMock,
-        mock_prepare_script: MagicMock,
-        mock_inject: MagicMock,
-        mock_list_procs: MagicMock,
+        mock_inject: Mock,
+        cli_runner: CliRunner,
+        mock_container_procs: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+        sample_process: ProcessInfo,
     ):
-        """Test that debug --container auto-selects when only one Python process."""
-        mock_list_procs.return_value = [
-            ProcessInfo(
-                pid=1, user="root", cpu_percent=0.5, mem_percent=1.2, command="python app.py"
-            )
-        ]
-        mock_prepare_script.return_value = "/tmp/test_script.py"
+        mock_container_procs.return_value = [replace(sample_process, pid=1)]
+        monkeypatch.setattr(
+            "debugwand.container.prepare_debugpy_script",
+            lambda port, wait: "/tmp/test_script.py",
+        )
+        monkeypatch.setattr(
+            "debugwand.container.print_connection_info", lambda port: None
+        )
+        # The first wait-loop sleep acts as Ctrl+C, which debug handles itself
+        monkeypatch.setattr(
+            "debugwand.container.time.sleep", _raising(KeyboardInterrupt())
+        )
+
+        result = cli_runner.invoke(app, ["debug", "--container", "test-container"])
 
-        # Use catch_exceptions=False so KeyboardInterrupt propagates
-        # but we'll mock the sleep to raise it immediately
-        with patch("debugwand.container.time.sleep", side_effect=KeyboardInterrupt):
-            runner.invoke(app, ["debug", "--container", "test-container"])
+        assert result.exit_code == 0
 
         # Should have called inject with PID 1
         mock_inject.assert_called_once()
@@ -381,24 +560,31 @@ root         1  0.5  1.2 123456 12345 ?        Ss   10:00   0:01 nginx
         assert call_args[0][1] == "test-container"
         assert call_args[0][2] == 1
 
-    @patch("debugwand.container.list_python_processes")
-    def test_debug_container_container_not_found(self, mock_list_procs: MagicMock):
-        """Test debug --container when container doesn't exist."""
-        mock_list_procs.side_effect = subprocess.CalledProcessError(
+    def test_debug_container_container_not_found(
+        self, cli_runner: CliRunner, mock_container_procs: Mock
+    ):
+        mock_container_procs.side_effect = subprocess.CalledProcessError(
             1, "docker exec", stderr="Error: No such container: bad-container"
         )
 
-        result = runner.invoke(app, ["debug", "--container", "bad-container"])
+        result = cli_runner.invoke(app, ["debug", "--container", "bad-container"])
 
         assert result.exit_code == 1
         assert "Failed to list processes" in result.stderr
 
 
+_UVICORN = ProcessInfo(1, "root", 0.5, 1.2, "python -m uvicorn app:app")
+_UVICORN_RELOAD = ProcessInfo(1, "root", 0.5, 1.2, "python -m uvicorn app:app --reload")
+_SPAWN_WORKER_10 = ProcessInfo(
+    10, "root", 0.1, 0.5, "python -c from multiprocessing.spawn import spawn_main"
+)
+
+
+@pytest.mark.xdist_group("container")
 class TestContainerReloadMode:
     """Tests for container reload mode detection and monitoring."""
 
     def test_detect_reload_mode_with_reload_flag(self):
-        """Test detecting reload mode when --reload is present."""
         processes = [
             ProcessInfo(
                 pid=1,
@@ -422,26 +608,16 @@ class TestContainerReloadMode:
         assert worker is not None
         assert worker.pid == 10
 
-    def test_detect_reload_mode_no_reload_flag(self):
-        """Test that reload mode is not detected without --reload."""
+    def test_detect_reload_mode_worker_listed_before_parent(self):
+        """Test that the worker is found regardless of its position in the list."""
         processes = [
             ProcessInfo(
-                pid=1,
+                pid=10,
                 user="root",
-                cpu_percent=0.5,
-                mem_percent=1.2,
-                command="python -m uvicorn app:app",
+                cpu_percent=0.1,
+                mem_percent=0.5,
+                command="python -c from multiprocessing.spawn import spawn_main",
             ),
-        ]
-
-        is_reload, worker = detect_reload_mode(processes)
-
-        assert is_reload is False
-        assert worker is None
-
-    def test_detect_reload_mode_reload_but_no_worker(self):
-        """Test reload mode detected but worker not yet spawned."""
-        processes = [
             ProcessInfo(
                 pid=1,
                 user="root",
@@ -454,36 +630,27 @@ class TestContainerReloadMode:
         is_reload, worker = detect_reload_mode(processes)
 
         assert is_reload is True
-        assert worker is None
+        assert worker is not None
+        assert worker.pid == 10
 
-    @patch("debugwand.container.list_python_processes")
-    def test_monitor_worker_pid_no_change(self, mock_list_procs: MagicMock):
-        """Test monitoring returns same PID when worker hasn't changed."""
-        mock_list_procs.return_value = [
+    def test_detect_reload_mode_no_reload_flag(self):
+        processes = [
             ProcessInfo(
                 pid=1,
                 user="root",
                 cpu_percent=0.5,
                 mem_percent=1.2,
-                command="python -m uvicorn app:app --reload",
-            ),
-            ProcessInfo(
-                pid=10,
-                user="root",
-                cpu_percent=0.1,
-                mem_percent=0.5,
-                command="python -c from multiprocessing.spawn import spawn_main",
+                command="python -m uvicorn app:app",
             ),
         ]
 
-        result = monitor_worker_pid("docker", "test-container", 10)
+        is_reload, worker = detect_reload_mode(processes)
 
-        assert result == 10
+        assert is_reload is False
+        assert worker is None
 
-    @patch("debugwand.container.list_python_processes")
-    def test_monitor_worker_pid_changed(self, mock_list_procs: MagicMock):
-        """Test monitoring detects when worker PID changes."""
-        mock_list_procs.return_value = [
+    def test_detect_reload_mode_reload_but_no_worker(self):
+        processes = [
             ProcessInfo(
                 pid=1,
                 user="root",
@@ -491,74 +658,64 @@ class TestContainerReloadMode:
                 mem_percent=1.2,
                 command="python -m uvicorn app:app --reload",
             ),
-            ProcessInfo(
-                pid=20,
-                user="root",
-                cpu_percent=0.1,
-                mem_percent=0.5,
-                command="python -c from multiprocessing.spawn import spawn_main",
-            ),
         ]
 
-        result = monitor_worker_pid("docker", "test-container", 10)
-
-        assert result == 20
-
-    @patch("debugwand.container.list_python_processes")
-    def test_monitor_worker_pid_container_gone(self, mock_list_procs: MagicMock):
-        """Test monitoring returns None when container is gone."""
-        mock_list_procs.return_value = []
-
-        result = monitor_worker_pid("docker", "test-container", 10)
-
-        assert result is None
+        is_reload, worker = detect_reload_mode(processes)
 
-    @patch("debugwand.container.list_python_processes")
-    def test_monitor_worker_pid_no_longer_reload_mode(self, mock_list_procs: MagicMock):
-        """Test monitoring returns None when no longer in reload mode."""
-        mock_list_procs.return_value = [
-            ProcessInfo(
-                pid=1,
-                user="root",
-                cpu_percent=0.5,
-                mem_percent=1.2,
-                command="python -m uvicorn app:app",  # No --reload
-            ),
-        ]
+        assert is_reload is True
+        assert worker is None
 
-        result = monitor_worker_pid("docker", "test-container", 10)
+    @pytest.mark.parametrize(
+        "processes, expected",
+        [
+            ([_UVICORN_RELOAD, _SPAWN_WORKER_10], 10),
+            ([_UVICORN_RELOAD, replace(_SPAWN_WORKER_10, pid=20)], 20),
+            ([], None),  # container is gone
+            ([_UVICORN], None),  # no longer in reload mode
+        ],
+        ids=["no_change", "changed", "container_gone", "no_longer_reload_mode"],
+    )
+    def test_monitor_worker_pid(
+        self,
+        mock_container_procs: Mock,
+        processes: list[ProcessInfo],
+        expected: int | None,
+    ):
+        mock_container_procs.return_value = processes
 
-        assert result is None
+        assert monitor_worker_pid("docker", "test-container", 10) == expected
 
-    @patch("debugwand.container.list_python_processes")
-    def test_monitor_worker_pid_exception(self, mock_list_procs: MagicMock):
+    def test_monitor_worker_pid_exception(self, mock_container_procs: Mock):
         """Test monitoring returns None on exception."""
-        mock_list_procs.side_effect = subprocess.CalledProcessError(1, "docker exec")
+        mock_container_procs.side_effect = subprocess.CalledProcessError(
+            1, "docker exec"
+        )
 
         result = monitor_worker_pid("docker", "test-container", 10)
 
         assert result is None
 
 
+@pytest.mark.xdist_group("container")
 class TestContainerRuntime(unittest.TestCase):
     """Tests for container runtime detection."""
 
-    @patch("debugwand.container.shutil.which")
-    def test_detect_runtime_podman_available(self, mock_which: MagicMock):
+    @patch("debugwand.container.shutil.which", new_callable=Mock)
+    def test_detect_runtime_podman_available(self, mock_which: Mock):
         """Test that podman is preferred when available."""
         mock_which.side_effect = lambda cmd: "/usr/bin/podman" if cmd == "podman" else None
 
         assert detect_runtime() == "podman"
 
-    @patch("debugwand.container.shutil.which")
-    def test_detect_runtime_docker_only(self, mock_which: MagicMock):
+    @patch("debugwand.container.shutil.which", new_callable=Mock)
+    def test_detect_runtime_docker_only(self, mock_which: Mock):
         """Test fallback to docker when podman is not available."""
         mock_which.side_effect = lambda cmd: "/usr/bin/docker" if cmd == "docker" else None
 
         assert detect_runtime() == "docker"
 
-    @patch("debugwand.container.shutil.which")
-    def test_detect_runtime_neither_available(self, mock_which: MagicMock):
+    @patch("debugwand.container.shutil.which", new_callable=Mock)
+    def test_detect_runtime_neither_available(self, mock_which: Mock):
         """Test RuntimeError when neither runtime is available."""
         mock_which.return_value = None
 